@@ -137,7 +137,6 @@ class AzurLaneAutoScript:
         Save last 60 screenshots in ./log/error/<timestamp>
         Save logs to ./log/error/<timestamp>/log.txt
         """
-        from module.base.utils import save_image
         from module.handler.sensitive_info import (handle_sensitive_image,
                                                    handle_sensitive_logs)
         if self.config.Error_SaveError:
@@ -146,10 +145,9 @@ class AzurLaneAutoScript:
             folder = f'./log/error/{int(time.time() * 1000)}'
             logger.warning(f'Saving error: {folder}')
             os.mkdir(folder)
-            for data in self.device.screenshot_deque:
-                image_time = datetime.strftime(data['time'], '%Y-%m-%d_%H-%M-%S-%f')
-                image = handle_sensitive_image(data['image'])
-                save_image(image, f'{folder}/{image_time}.png')
+            self.device.screenshot_recorder.save(folder, handle=handle_sensitive_image)
+            # Logs are written in background, wait until they reach the log file
+            logger.flush()
             with open(logger.log_file, 'r', encoding='utf-8') as f:
                 lines = f.readlines()
                 start = 0
@@ -448,7 +446,8 @@ class AzurLaneAutoScript:
         future = future + timedelta(seconds=1)
         self.config.start_watching()
         while 1:
-            if datetime.now() > future:
+            now = datetime.now()
+            if now > future:
                 return True
             if self.stop_event is not None:
                 if self.stop_event.is_set():
@@ -456,9 +455,12 @@ class AzurLaneAutoScript:
                     logger.info(f"[{self.config_name}] exited. Reason: Update")
                     exit(0)
 
-            time.sleep(5)
-
-            if self.config.should_reload():
+            # Wake up as soon as config file changed, or every 5s to check stop event
+            timeout = min(5, (future - now).total_seconds() + 0.1)
+            if self.config.wait_reload(timeout=timeout):
+                keys = self.config.get_changed_keys()
+                if keys:
+                    logger.info(f'Changed: {", ".join(keys[:10])}{", ..." if len(keys) > 10 else ""}')
                 return False
 
     def get_next_task(self):
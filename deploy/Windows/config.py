@@ -37,6 +37,7 @@ class ConfigModel:
     UseOcrServer: bool = False
     StartOcrServer: bool = False
     OcrServerPort: int = 22268
+    OcrServerWorkers: int = 2
     OcrClientAddress: str = "127.0.0.1:22268"
 
     # Update
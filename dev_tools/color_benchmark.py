@@ -0,0 +1,107 @@
+import module.config.server as server
+
+server.server = 'cn'  # Don't need to edit, it's used to avoid error.
+
+import importlib
+import os
+import time
+
+import cv2
+import numpy as np
+
+from module.base.button import Button
+from module.base.utils import FRAME_CACHE, crop, get_color, get_color_batch, load_image
+
+"""
+This file benchmarks get_color() on recorded screenshots,
+comparing the plain crop + cv2.mean path and the per-frame integral image path.
+
+Color buttons from all module/*/assets.py are probed on each screenshot, like a state loop does.
+"""
+
+"""
+Step 1:
+    Put your screenshot folder here, 1280x720 png files.
+    Screenshots saved by Error_SaveError in ./log/error/<timestamp> are good choices.
+"""
+FOLDER = ''
+"""
+Step 2:
+    Number of color buttons to probe on each frame.
+    A typical state loop probes 10-50 buttons.
+"""
+PROBES = (10, 30, 100, 300)
+
+
+def load_buttons():
+    buttons = []
+    for module in os.listdir('./module'):
+        if not os.path.exists(f'./module/{module}/assets.py'):
+            continue
+        assets = importlib.import_module(f'module.{module}.assets')
+        for value in assets.__dict__.values():
+            if isinstance(value, Button) and value.color:
+                buttons.append(value)
+    return buttons
+
+
+def load_images(folder):
+    images = []
+    for file in os.listdir(folder):
+        if file.endswith('.png'):
+            images.append(load_image(os.path.join(folder, file)))
+    return images
+
+
+def plain_color(image, area):
+    return cv2.mean(crop(image, area, copy=False))[:3]
+
+
+def run(images, buttons, probes):
+    areas = [button.area for button in buttons[:probes]]
+
+    # Plain crop + mean
+    start = time.perf_counter()
+    plain = []
+    for image in images:
+        plain.append([plain_color(image, area) for area in areas])
+    cost_plain = time.perf_counter() - start
+
+    # Frame cache, integral image built lazily
+    start = time.perf_counter()
+    cached = []
+    for image in images:
+        FRAME_CACHE.set(image)
+        cached.append([get_color(image, area) for area in areas])
+    cost_cached = time.perf_counter() - start
+
+    # Batched, integral image built at once if worth it
+    start = time.perf_counter()
+    batched = []
+    for image in images:
+        FRAME_CACHE.set(image)
+        batched.append(get_color_batch(image, areas))
+    cost_batched = time.perf_counter() - start
+
+    # Results must be identical
+    diff = max(np.max(np.abs(np.array(plain) - np.array(cached))),
+               np.max(np.abs(np.array(plain) - np.array(batched))))
+    n = len(images)
+    print(f'{str(probes).rjust(4)} probes | '
+          f'plain {cost_plain / n * 1000:.3f}ms | '
+          f'frame cache {cost_cached / n * 1000:.3f}ms | '
+          f'batch {cost_batched / n * 1000:.3f}ms | '
+          f'max diff {diff:.6f}')
+
+
+if __name__ == '__main__':
+    buttons = load_buttons()
+    images = load_images(FOLDER)
+    print(f'{len(images)} screenshots, {len(buttons)} color buttons')
+    # Integral image alone
+    start = time.perf_counter()
+    for image in images:
+        cv2.integral(image)
+    print(f'cv2.integral {(time.perf_counter() - start) / len(images) * 1000:.3f}ms per frame')
+    for probes in PROBES:
+        run(images, buttons, probes=min(probes, len(buttons)))
@@ -0,0 +1,74 @@
+import module.config.server as server
+
+server.server = 'cn'  # Don't need to edit, it's used to avoid error.
+
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from module.config.config import AzurLaneConfig
+from module.map_detection.view import View
+
+"""
+This file benchmarks grid prediction on worker threads, comparing View.predict() with
+different `Optimization_MapDetectionWorkers`.
+Map screenshots are the ones used in dev_tools/grids_debug.py, map detection runs outside Alas.
+"""
+
+"""
+Step 1:
+    Paste your config here, the same as dev_tools/grids_debug.py
+"""
+
+
+class Config:
+    DETECTION_BACKEND = 'homography'
+
+
+"""
+Step 2:
+    Put a folder of map screenshots here.
+"""
+FOLDER = ''
+WORKERS = [1, 2, 3, 4]
+ROUNDS = 10
+
+ATTRIBUTES = [
+    'is_enemy', 'enemy_scale', 'enemy_genre', 'is_boss', 'is_fleet', 'is_current_fleet',
+    'is_submarine', 'is_mystery', 'is_siren', 'is_missile_attack'
+]
+
+
+def result(view):
+    return {grid.location: tuple(getattr(grid, attr) for attr in ATTRIBUTES) for grid in view}
+
+
+def run(file):
+    image = np.array(Image.open(file).convert('RGB'))
+    config = AzurLaneConfig('template').merge(Config())
+    view = View(config)
+
+    costs = []
+    results = []
+    for workers in WORKERS:
+        config.Optimization_MapDetectionWorkers = workers
+        # Load again to get grids without predicted info, first predict also warms up
+        view.load(image)
+        view.predict()
+        results.append(result(view))
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            view.predict()
+        costs.append((time.perf_counter() - start) / ROUNDS)
+
+    same = all([r == results[0] for r in results[1:]])
+    cost = ' | '.join([f'{workers} threads {cost * 1000:.1f}ms' for workers, cost in zip(WORKERS, costs)])
+    print(f'{os.path.basename(file)} | {len(view.grids)} grids | {cost} | same result {same}')
+
+
+if __name__ == '__main__':
+    for name in sorted(os.listdir(FOLDER)):
+        if name.endswith('.png'):
+            run(os.path.join(FOLDER, name))
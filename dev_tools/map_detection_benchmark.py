@@ -0,0 +1,300 @@
+import module.config.server as server
+
+server.server = 'cn'  # Don't need to edit, it's used to avoid error.
+
+import json
+import logging
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from module.base.utils import location2node
+from module.config.config import AzurLaneConfig
+from module.logger import logger
+from module.map_detection.grid import Grid
+from module.map_detection.homography import Homography
+from module.map_detection.os_grid import OSGrid
+from module.map_detection.perspective import Perspective
+from module.map_detection.view import View
+from module.os.globe_detection import GlobeDetection
+from module.os.radar import Radar
+
+"""
+This file replays recorded screenshots through map detection, outside Alas and without a device.
+
+Each stage runs on a folder of screenshots, in the order of file names as they were recorded,
+and the whole folder is replayed for several rounds. Time cost of each step is reported in p50 and p95,
+detection results are compared with a golden file, so both performance regressions and
+detection changes can be found.
+
+Stages:
+    perspective: Perspective.load()
+    homography: Homography.load()
+    view: View.load() and View.predict()
+    globe: GlobeDetection.load(), screenshots of OS globe map
+    radar: Radar.predict(), screenshots in OS
+"""
+
+"""
+Step 1:
+    Paste your config here, the same as dev_tools/grids_debug.py
+    To benchmark OS maps, set `Scheduler_Command = 'OpsiExplore'` and VIEW_MODE = 'os'.
+"""
+
+
+class Config:
+    DETECTION_BACKEND = 'homography'
+
+
+VIEW_MODE = 'main'
+
+"""
+Step 2:
+    Put folders of screenshots here, leave empty to skip that stage.
+"""
+FOLDERS = {
+    'perspective': '',
+    'homography': '',
+    'view': '',
+    'globe': '',
+    'radar': '',
+}
+ROUNDS = 5
+# Hide detection logs while replaying, only warnings and errors are shown
+QUIET = True
+
+"""
+Step 3:
+    Golden file of detection results.
+    Results of stages not in the golden file are saved as golden.
+    Set UPDATE_GOLDEN = True to overwrite it after checking the differences.
+"""
+GOLDEN = './log/map_detection_golden.json'
+UPDATE_GOLDEN = False
+
+
+def get_config():
+    return AzurLaneConfig('template').merge(Config())
+
+
+def load_images(folder):
+    """
+    Returns:
+        list[tuple[str, np.ndarray]]: File name and image.
+    """
+    images = []
+    for file in sorted(os.listdir(folder)):
+        if os.path.splitext(file)[1].lower() in ['.png', '.jpg', '.bmp']:
+            images.append((file, np.array(Image.open(os.path.join(folder, file)).convert('RGB'))))
+    return images
+
+
+def edges(backend):
+    return [bool(backend.left_edge), bool(backend.right_edge), bool(backend.upper_edge), bool(backend.lower_edge)]
+
+
+class Stage:
+    name = ''
+
+    def __init__(self, config):
+        self.config = config
+
+    def replay(self, image):
+        """
+        Args:
+            image (np.ndarray):
+
+        Returns:
+            tuple[dict, object]: Time cost in seconds of each step, and detection result in json types.
+        """
+        pass
+
+
+class PerspectiveStage(Stage):
+    name = 'perspective'
+
+    def replay(self, image):
+        perspective = Perspective(self.config)
+        start = time.perf_counter()
+        perspective.load(image)
+        cost = {'load': time.perf_counter() - start}
+        result = {
+            'vanish_point': np.round(perspective.vanish_point).astype(int).tolist(),
+            'lines': [len(perspective.horizontal), len(perspective.vertical)],
+            'edges': edges(perspective),
+        }
+        return cost, result
+
+
+class HomographyStage(Stage):
+    name = 'homography'
+
+    def __init__(self, config):
+        super().__init__(config)
+        # Keep homography data and tracking between screenshots, as in Alas
+        self.homography = Homography(config)
+
+    def replay(self, image):
+        start = time.perf_counter()
+        self.homography.load(image)
+        cost = {'load': time.perf_counter() - start}
+        result = {
+            'homo_loca': np.round(self.homography.homo_loca).astype(int).tolist(),
+            'edges': edges(self.homography),
+        }
+        return cost, result
+
+
+class ViewStage(Stage):
+    name = 'view'
+
+    def __init__(self, config):
+        super().__init__(config)
+        if VIEW_MODE == 'os':
+            self.view = View(config, mode='os', grid_class=OSGrid)
+        else:
+            self.view = View(config, grid_class=Grid)
+
+    def replay(self, image):
+        start = time.perf_counter()
+        self.view.load(image)
+        loaded = time.perf_counter()
+        self.view.predict()
+        predicted = time.perf_counter()
+        cost = {'load': loaded - start, 'predict': predicted - loaded}
+        result = {location2node(grid.location): grid.str for grid in self.view}
+        return cost, result
+
+
+class GlobeStage(Stage):
+    name = 'globe'
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.globe = GlobeDetection(config)
+        # Loading globe map is done once in Alas, don't count it in
+        self.globe.load_globe_map()
+
+    def replay(self, image):
+        start = time.perf_counter()
+        self.globe.load(image)
+        cost = {'load': time.perf_counter() - start}
+        result = {'center_loca': np.round(self.globe.center_loca).astype(int).tolist()}
+        return cost, result
+
+
+class RadarStage(Stage):
+    name = 'radar'
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.radar = Radar(config)
+
+    def replay(self, image):
+        start = time.perf_counter()
+        self.radar.predict(image)
+        cost = {'predict': time.perf_counter() - start}
+        result = {f'{x},{y}': grid.str for (x, y), grid in self.radar.grids.items()}
+        return cost, result
+
+
+STAGES = [PerspectiveStage, HomographyStage, ViewStage, GlobeStage, RadarStage]
+
+
+def run(stage_class, folder):
+    """
+    Returns:
+        tuple[dict, dict]:
+            Time costs, key: step name, value: list of seconds.
+            Results, key: file name, value: result of the first round.
+    """
+    images = load_images(folder)
+    stage = stage_class(get_config())
+    costs = {}
+    results = {}
+    for _ in range(ROUNDS):
+        for file, image in images:
+            start = time.perf_counter()
+            try:
+                cost, result = stage.replay(image)
+            except Exception as e:
+                # Detection errors are results too, time cost of failed replays is counted separately
+                cost, result = {'failed': time.perf_counter() - start}, f'{e.__class__.__name__}: {e}'
+            for step, value in cost.items():
+                costs.setdefault(f'{stage.name}.{step}', []).append(value)
+            # Results are json types, round trip them to compare with golden
+            results.setdefault(file, json.loads(json.dumps(result)))
+    return costs, results
+
+
+def diff(golden, results):
+    """
+    Args:
+        golden (dict): Key: file name, value: result.
+        results (dict): Key: file name, value: result.
+
+    Returns:
+        list[str]: Differences.
+    """
+    out = []
+    for file in sorted(set(golden) | set(results)):
+        if file not in golden:
+            out.append(f'{file}: new file')
+        elif file not in results:
+            out.append(f'{file}: missing file')
+        elif golden[file] != results[file]:
+            old, new = golden[file], results[file]
+            if isinstance(old, dict) and isinstance(new, dict):
+                for key in sorted(set(old) | set(new)):
+                    if old.get(key) != new.get(key):
+                        out.append(f'{file}: {key} {old.get(key)} -> {new.get(key)}')
+            else:
+                out.append(f'{file}: {old} -> {new}')
+    return out
+
+
+if __name__ == '__main__':
+    if QUIET:
+        logger.setLevel(logging.WARNING)
+    golden = {}
+    if os.path.exists(GOLDEN):
+        with open(GOLDEN, 'r', encoding='utf-8') as f:
+            golden = json.load(f)
+
+    costs = {}
+    results = {}
+    for stage_class in STAGES:
+        folder = FOLDERS.get(stage_class.name, '')
+        if not folder:
+            continue
+        cost, result = run(stage_class, folder)
+        costs.update(cost)
+        results[stage_class.name] = result
+
+    print('Time cost')
+    for step, value in costs.items():
+        value = np.array(value) * 1000
+        print(f'{step.ljust(22)} | {len(value):>4} runs | '
+              f'p50 {np.percentile(value, 50):8.2f}ms | p95 {np.percentile(value, 95):8.2f}ms | '
+              f'max {np.max(value):8.2f}ms')
+
+    print('Detection results')
+    for name, result in results.items():
+        if name not in golden:
+            print(f'{name.ljust(22)} | {len(result)} files | no golden')
+            continue
+        differences = diff(golden[name], result)
+        print(f'{name.ljust(22)} | {len(result)} files | {len(differences)} differences')
+        for line in differences:
+            print(f'    {line}')
+
+    # Save stages that have no golden yet, or all stages if UPDATE_GOLDEN
+    saving = {name: result for name, result in results.items() if UPDATE_GOLDEN or name not in golden}
+    if saving:
+        golden.update(saving)
+        os.makedirs(os.path.dirname(GOLDEN), exist_ok=True)
+        with open(GOLDEN, 'w', encoding='utf-8') as f:
+            json.dump(golden, f, indent=2, sort_keys=True)
+        print(f'Golden saved to {GOLDEN}')
@@ -0,0 +1,135 @@
+import module.config.server as server
+
+server.server = 'cn'  # Don't need to edit, it's used to avoid error.
+
+import importlib
+import os
+import time
+
+from module.map.map_base import CampaignMap
+
+"""
+This file benchmarks CampaignMap.find_path_initial() on all maps in campaign/*,
+comparing the heap-based Dijkstra with the set-based relaxation it replaced.
+
+On each map, grids that may spawn enemies are set as enemies, then paths are calculated from every sea grid.
+"""
+
+"""
+Step 1:
+    Folders to benchmark, or [] for all folders in campaign/.
+"""
+FOLDERS = []
+ROUNDS = 3
+
+
+def find_path_initial_legacy(self, location, has_ambush=True, has_enemy=True):
+    """
+    The set-based relaxation before, copied for comparison.
+    """
+    ambush_cost = 10 if has_ambush else 1
+    for grid in self:
+        grid.cost = 9999
+        grid.connection = None
+    start = self[location]
+    start.cost = 0
+    visited = [start]
+    visited = set(visited)
+
+    while 1:
+        new = visited.copy()
+        for grid in visited:
+            for arr in self.grid_connection[grid.location]:
+                arr = self[arr]
+                if arr.is_land or arr.is_mechanism_block:
+                    continue
+                cost = ambush_cost if arr.may_ambush else 1
+                cost += grid.cost
+
+                if cost < arr.cost:
+                    arr.cost = cost
+                    arr.connection = grid.location
+                elif cost == arr.cost:
+                    if abs(arr.location[0] - grid.location[0]) == 1:
+                        arr.connection = grid.location
+                if arr.is_sea or not has_enemy:
+                    new.add(arr)
+        if len(new) == len(visited):
+            break
+        visited = new
+
+
+def iter_maps():
+    """
+    Yields:
+        tuple[str, CampaignMap]:
+    """
+    folders = FOLDERS if FOLDERS else sorted(os.listdir('./campaign'))
+    for folder in folders:
+        if not os.path.isdir(f'./campaign/{folder}'):
+            continue
+        for file in sorted(os.listdir(f'./campaign/{folder}')):
+            name, ext = os.path.splitext(file)
+            if ext != '.py' or name.startswith('_') or name.endswith('_base'):
+                continue
+            try:
+                module = importlib.import_module(f'campaign.{folder}.{name}')
+            except Exception as e:
+                print(f'{folder}/{name}: Failed to import, {e}')
+                continue
+            if isinstance(getattr(module, 'MAP', None), CampaignMap):
+                yield f'{folder}/{name}', module.MAP
+
+
+def run(name, campaign_map):
+    campaign_map.grid_connection_initial(wall=True, portal=True)
+    for grid in campaign_map:
+        grid.is_enemy = grid.may_enemy or grid.may_boss
+    starts = [grid.location for grid in campaign_map if grid.is_sea]
+
+    start_time = time.perf_counter()
+    for _ in range(ROUNDS):
+        legacy = []
+        legacy_connection = []
+        for location in starts:
+            find_path_initial_legacy(campaign_map, location)
+            legacy.append([grid.cost for grid in campaign_map])
+            legacy_connection.append([grid.connection for grid in campaign_map])
+    cost_legacy = time.perf_counter() - start_time
+
+    campaign_map._path_cache.clear()
+    start_time = time.perf_counter()
+    dijkstra = []
+    dijkstra_connection = []
+    for location in starts:
+        campaign_map.find_path_initial(location)
+        dijkstra.append([grid.cost for grid in campaign_map])
+        dijkstra_connection.append([grid.connection for grid in campaign_map])
+    cost_first = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for _ in range(ROUNDS):
+        for location in starts:
+            campaign_map.find_path_initial(location)
+    cost_cached = time.perf_counter() - start_time
+
+    # Legacy relaxation may stop before costs converge, count grids it didn't find the shortest path
+    longer = sum([a > b for costs_a, costs_b in zip(legacy, dijkstra) for a, b in zip(costs_a, costs_b)])
+    shorter = sum([a < b for costs_a, costs_b in zip(legacy, dijkstra) for a, b in zip(costs_a, costs_b)])
+    # Previous grid on route may differ, when predecessors have the same cost
+    connection = sum([a != b and cost_a == cost_b
+                      for conn_a, conn_b, costs_a, costs_b in zip(legacy_connection, dijkstra_connection, legacy, dijkstra)
+                      for a, b, cost_a, cost_b in zip(conn_a, conn_b, costs_a, costs_b)])
+    for grid in campaign_map:
+        grid.is_enemy = False
+    return cost_legacy / ROUNDS, cost_first, cost_cached / ROUNDS, len(starts), longer, shorter, connection
+
+
+if __name__ == '__main__':
+    total = [0., 0., 0.]
+    for name, campaign_map in iter_maps():
+        legacy, first, cached, starts, longer, shorter, connection = run(name, campaign_map)
+        total = [a + b for a, b in zip(total, [legacy, first, cached])]
+        print(f'{name.ljust(40)} | {starts:>3} starts | legacy {legacy * 1000:7.2f}ms | '
+              f'dijkstra {first * 1000:6.2f}ms | cached {cached * 1000:6.2f}ms | '
+              f'legacy longer {longer}, shorter {shorter}, connection changed {connection}')
+    print(f'Total | legacy {total[0]:.3f}s | dijkstra {total[1]:.3f}s | cached {total[2]:.3f}s')
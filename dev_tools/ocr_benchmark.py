@@ -0,0 +1,93 @@
+import module.config.server as server
+
+server.server = 'cn'  # Don't need to edit, it's used to avoid error.
+
+import time
+
+import cv2
+import numpy as np
+
+from module.ocr.models import OCR_MODEL
+
+"""
+This file benchmarks batched OCR, comparing one atomic_ocr_for_single_lines() call per Ocr object
+and one atomic_ocr_for_batch() call for all Ocr objects on a screen.
+
+Images are rendered text lines like what Ocr.pre_process() produces, dark letters on white background.
+"""
+
+"""
+Step 1:
+    Models to benchmark, attribute names of OCR_MODEL.
+"""
+LANGS = ['azur_lane', 'azur_lane_jp', 'cnocr', 'jp', 'tw']
+"""
+Step 2:
+    Ocr objects on a screen, and buttons of each Ocr object.
+    Commission list has 4 commissions each having 3-4 Ocr objects of 1 button,
+    dock has 14 ship cards having 1 Ocr object of 14 buttons.
+"""
+CASES = [(4, 1), (16, 1), (1, 14), (4, 4)]
+ALPHABETS = [None, '0123456789IDSB', '0123456789:IDSB', '0123456789/IDSB']
+ROUNDS = 20
+
+
+def render(text, width):
+    image = np.full((24, width), 255, dtype=np.uint8)
+    cv2.putText(image, text, (2, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, 0, 2)
+    return image
+
+
+def generate(objects, buttons, random):
+    """
+    Returns:
+        list[tuple[list[np.ndarray], str]]: Images and alphabet of each Ocr object.
+    """
+    tasks = []
+    for index in range(objects):
+        alphabet = ALPHABETS[index % len(ALPHABETS)]
+        images = []
+        for _ in range(buttons):
+            if alphabet is not None and ':' in alphabet:
+                text = '%02d:%02d:%02d' % tuple(random.randint(0, 60, 3))
+            elif alphabet is not None and '/' in alphabet:
+                text = '%d/%d' % tuple(random.randint(0, 100, 2))
+            else:
+                text = str(random.randint(0, 100000))
+            images.append(render(text, width=random.randint(60, 160)))
+        tasks.append((images, alphabet))
+    return tasks
+
+
+def run(lang, objects, buttons):
+    model = OCR_MODEL.__getattribute__(lang)
+    tasks = generate(objects, buttons, random=np.random.RandomState(0))
+
+    # Warm up, load model
+    model.atomic_ocr_for_single_lines(tasks[0][0], tasks[0][1])
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        single = [model.atomic_ocr_for_single_lines(images, alphabet) for images, alphabet in tasks]
+    cost_single = (time.perf_counter() - start) / ROUNDS
+
+    img_list = [image for images, _ in tasks for image in images]
+    alphabet_list = [alphabet for images, alphabet in tasks for _ in images]
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        batched = model.atomic_ocr_for_batch(img_list, alphabet_list)
+    cost_batch = (time.perf_counter() - start) / ROUNDS
+
+    # Padding may change results of the recurrent layer, count how many are the same
+    single = [''.join(result) for results in single for result in results]
+    batched = [''.join(result) for result in batched]
+    same = sum([a == b for a, b in zip(single, batched)])
+    print(f'{lang.ljust(12)} | {objects:>2} objects x {buttons:>2} buttons | '
+          f'single {cost_single * 1000:.2f}ms | batch {cost_batch * 1000:.2f}ms | '
+          f'same result {same}/{len(single)}')
+
+
+if __name__ == '__main__':
+    for lang in LANGS:
+        for objects, buttons in CASES:
+            run(lang, objects=objects, buttons=buttons)
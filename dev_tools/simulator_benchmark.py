@@ -0,0 +1,84 @@
+import module.config.server as server
+
+server.server = 'cn'  # Don't need to edit, it's used to avoid error.
+
+import json
+import os
+
+from module.config.config import AzurLaneConfig
+from module.device.device import Device
+from module.logger import logger
+from module.ui.page import Page
+from module.ui.ui import UI
+
+"""
+This file runs task logic on a simulator device, to profile CPU cost of task loops without an emulator.
+See module/device/method/simulator.py for the session format.
+
+The simulator serves screenshots of a recorded session, and changes state when clicks hit recorded areas.
+A session of UI pages can be generated from screenshots named after pages,
+such as `page_main.png`, `page_reward.png`, transitions are links between pages in module/ui/page.py.
+"""
+
+"""
+Step 1:
+    Put screenshots of pages in a folder, named after pages.
+    session.json will be generated if not exists.
+"""
+FOLDER = './log/simulator'
+START = 'page_main'
+
+"""
+Step 2:
+    Pages to go in cycle, and rounds.
+"""
+ROUTE = ['page_reward', 'page_main']
+ROUNDS = 10
+
+
+class Config:
+    Emulator_ScreenshotMethod = 'Simulator'
+    Emulator_ControlMethod = 'Simulator'
+    SIMULATOR_SESSION = FOLDER
+
+
+def generate_session(folder, start):
+    """
+    Generate session.json from screenshots of pages and links between pages.
+
+    Args:
+        folder (str):
+        start (str): Name of the first page.
+    """
+    names = [os.path.splitext(file)[0] for file in os.listdir(folder) if file.endswith('.png')]
+    states = {}
+    for name in names:
+        page = Page.all_pages.get(name)
+        if page is None:
+            continue
+        clicks = []
+        for destination, button in page.links.items():
+            if destination.name in names:
+                button.clear_offset()
+                clicks.append({'area': list(button.button), 'state': destination.name})
+        states[name] = {'image': f'{name}.png', 'clicks': clicks}
+    logger.info(f'Generated {len(states)} states from {folder}')
+
+    with open(os.path.join(folder, 'session.json'), 'w', encoding='utf-8') as f:
+        json.dump({'start': start, 'states': states}, f, indent=2)
+
+
+if __name__ == '__main__':
+    if not os.path.exists(os.path.join(FOLDER, 'session.json')):
+        generate_session(FOLDER, start=START)
+
+    config = AzurLaneConfig('template').merge(Config())
+    device = Device(config)
+    ui = UI(config, device=device)
+    device.screenshot()
+
+    for _ in range(ROUNDS):
+        for name in ROUTE:
+            ui.ui_goto(Page.all_pages[name], get_ship=False)
+
+    device.simulator_report()
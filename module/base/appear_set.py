@@ -0,0 +1,95 @@
+from module.base.utils import color_similar, get_color_batch
+
+
+class AppearSet:
+    def __init__(self, *buttons, offset=0, similarity=0.85, threshold=10):
+        """
+        A set of buttons to be detected on the same screenshot.
+
+        Color detections of all buttons are done in one pass over an integral image,
+        instead of cropping and averaging each area.
+        Template matchings are done after color detections, one by one, sharing the same screenshot.
+
+        Args:
+            *buttons (Button): Buttons to detect, using the default parameters below.
+            offset (int, tuple): Detection offset. 0 for color detection, others for template matching.
+            similarity (float): 0 to 1, used in template matching.
+            threshold (int): 0 to 255, used in color detection.
+
+        Examples:
+            POPUP = AppearSet(POPUP_CONFIRM, POPUP_CANCEL)
+            POPUP.add(GET_ITEMS_1, offset=(20, 20))
+
+            for _ in self.loop():
+                appear = self.appear_set(POPUP)
+                if appear[POPUP_CONFIRM] and appear[POPUP_CANCEL]:
+                    ...
+        """
+        # Key: Button. Value: (offset, similarity, threshold)
+        self.buttons = {}
+        for button in buttons:
+            self.add(button, offset=offset, similarity=similarity, threshold=threshold)
+
+    def add(self, button, offset=0, similarity=0.85, threshold=10):
+        """
+        Args:
+            button (Button):
+            offset (int, tuple): Detection offset. 0 for color detection, others for template matching.
+            similarity (float): 0 to 1, used in template matching.
+            threshold (int): 0 to 255, used in color detection.
+
+        Returns:
+            AppearSet: self, for chain calls.
+        """
+        self.buttons[button] = (offset, similarity, threshold)
+        return self
+
+    def remove(self, button):
+        """
+        Args:
+            button (Button):
+        """
+        self.buttons.pop(button, None)
+
+    def __iter__(self):
+        return iter(self.buttons)
+
+    def __len__(self):
+        return len(self.buttons)
+
+    def __contains__(self, item):
+        return item in self.buttons
+
+    def __str__(self):
+        return f'AppearSet({", ".join([str(button) for button in self.buttons])})'
+
+    __repr__ = __str__
+
+    def run(self, image, default_offset=30):
+        """
+        Args:
+            image (np.ndarray): Screenshot.
+            default_offset (int, tuple): Offset to use if a button is added with `offset=True`
+
+        Returns:
+            dict[Button, bool]: If each button appears on screenshot.
+        """
+        result = {}
+
+        # Color detection
+        color_buttons = [button for button, (offset, _, _) in self.buttons.items() if not offset]
+        if color_buttons:
+            colors = get_color_batch(image, [button.area for button in color_buttons])
+            for button, color in zip(color_buttons, colors):
+                _, _, threshold = self.buttons[button]
+                result[button] = color_similar(color1=color, color2=button.color, threshold=threshold)
+
+        # Template matching
+        for button, (offset, similarity, _) in self.buttons.items():
+            if not offset:
+                continue
+            if isinstance(offset, bool):
+                offset = default_offset
+            result[button] = button.match(image, offset=offset, similarity=similarity)
+
+        return result
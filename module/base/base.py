@@ -1,3 +1,4 @@
+from module.base.appear_set import AppearSet
 from module.base.button import Button
 from module.base.decorator import cached_property
 from module.base.timer import Timer
@@ -261,6 +262,29 @@ class ModuleBase:
 
         return appear
 
+    def appear_set(self, appear_set):
+        """
+        Detect a set of buttons on the current screenshot at once.
+
+        Args:
+            appear_set (AppearSet, list[Button]):
+
+        Returns:
+            dict[Button, bool]:
+
+        Examples:
+            POPUP = AppearSet(POPUP_CONFIRM, POPUP_CANCEL)
+            appear = self.appear_set(POPUP)
+            if appear[POPUP_CONFIRM]:
+                ...
+        """
+        if not isinstance(appear_set, AppearSet):
+            appear_set = AppearSet(*appear_set)
+        for button in appear_set:
+            self.device.stuck_record_add(button)
+
+        return appear_set.run(self.device.image, default_offset=self.config.BUTTON_OFFSET)
+
     def match_template_color(self, button, offset=(20, 20), interval=0, similarity=0.85, threshold=30):
         """
         Args:
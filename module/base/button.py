@@ -42,6 +42,9 @@ class Button(Resource):
         self.image = None
         self.image_binary = None
         self.image_luma = None
+        # Key: tuple, (method, offset, similarity, pyramid)
+        # Value: tuple, (frame_id, result, button_offset)
+        self._match_memo = {}
 
         if self.file:
             self.resource_add(key=self.file)
@@ -130,6 +133,7 @@ class Button(Resource):
         self.__dict__['color'] = get_color(image, self.area)
         self.image = crop(image, self.area)
         self.__dict__['is_gif'] = False
+        self._match_memo = {}
         return self.color
 
     def load_offset(self, button):
@@ -160,6 +164,7 @@ class Button(Resource):
             else:
                 self.image = load_image(self.file, self.area)
             self._match_init = True
+            self._match_memo = {}
 
     def ensure_binary_template(self):
         """
@@ -197,44 +202,102 @@ class Button(Resource):
         self._match_init = False
         self._match_binary_init = False
         self._match_luma_init = False
+        self._match_memo = {}
 
-    def match(self, image, offset=30, similarity=0.85):
+    def _memo_load(self, image, key, area):
+        """
+        Get result of a previous template matching,
+        if it was on a previous frame and pixels in search area are unchanged since then.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            key (tuple): Method and parameters of matching.
+            area (tuple): Search area.
+
+        Returns:
+            tuple: (result,), or None if no valid result.
+        """
+        if image is not FRAME_CACHE.image:
+            return None
+        try:
+            frame_id, result, button_offset = self._match_memo[key]
+        except KeyError:
+            return None
+        if FRAME_CACHE.area_unchanged(area, since=frame_id):
+            self._button_offset = button_offset
+            return result,
+        return None
+
+    def _memo_save(self, image, key, result):
+        """
+        Args:
+            image (np.ndarray): Screenshot.
+            key (tuple): Method and parameters of matching.
+            result (bool):
+
+        Returns:
+            bool: result
+        """
+        if image is FRAME_CACHE.image:
+            self._match_memo[key] = (FRAME_CACHE.frame_id, result, self._button_offset)
+        return result
+
+    @staticmethod
+    def _parse_offset(offset):
+        """
+        Args:
+            offset (int, tuple):
+
+        Returns:
+            np.ndarray: (x1, y1, x2, y2) offset of detection area.
+        """
+        if isinstance(offset, tuple):
+            if len(offset) == 2:
+                return np.array((-offset[0], -offset[1], offset[0], offset[1]))
+            else:
+                return np.array(offset)
+        else:
+            return np.array((-3, -offset, 3, offset))
+
+    def match(self, image, offset=30, similarity=0.85, pyramid=False):
         """Detects button by template matching. To Some button, its location may not be static.
 
         Args:
             image: Screenshot.
             offset (int, tuple): Detection area offset.
             similarity (float): 0-1. Similarity.
+            pyramid (bool): True to search coarse-to-fine, faster on large offsets. See match_template().
 
         Returns:
             bool.
         """
         self.ensure_template()
 
-        if isinstance(offset, tuple):
-            if len(offset) == 2:
-                offset = np.array((-offset[0], -offset[1], offset[0], offset[1]))
-            else:
-                offset = np.array(offset)
-        else:
-            offset = np.array((-3, -offset, 3, offset))
-        image = crop(image, offset + self.area, copy=False)
+        offset = self._parse_offset(offset)
+        area = offset + self.area
+        key = ('match', tuple(offset), similarity, pyramid)
+        memo = self._memo_load(image, key, area)
+        if memo is not None:
+            return memo[0]
+        screenshot = image
+        image = crop(image, area, copy=False)
 
+        result = False
         if self.is_gif:
             for template in self.image:
-                res = cv2.matchTemplate(template, image, cv2.TM_CCOEFF_NORMED)
-                _, sim, _, point = cv2.minMaxLoc(res)
+                sim, point = match_template(image, template, pyramid=pyramid)
                 self._button_offset = area_offset(self._button, offset[:2] + np.array(point))
                 if sim > similarity:
-                    return True
-            return False
+                    result = True
+                    break
         else:
-            res = cv2.matchTemplate(self.image, image, cv2.TM_CCOEFF_NORMED)
-            _, sim, _, point = cv2.minMaxLoc(res)
+            sim, point = match_template(image, self.image, pyramid=pyramid)
             self._button_offset = area_offset(self._button, offset[:2] + np.array(point))
-            return sim > similarity
+            result = sim > similarity
 
-    def match_binary(self, image, offset=30, similarity=0.85):
+        return self._memo_save(screenshot, key, result)
+
+    def match_binary(self, image, offset=30, similarity=0.85, pyramid=False):
         """Detects button by template matching. To Some button, its location may not be static.
            This method will apply template matching under binarization.
 
@@ -242,6 +305,7 @@ class Button(Resource):
             image: Screenshot.
             offset (int, tuple): Detection area offset.
             similarity (float): 0-1. Similarity.
+            pyramid (bool): True to search coarse-to-fine, faster on large offsets. See match_template().
 
         Returns:
             bool.
@@ -249,40 +313,31 @@ class Button(Resource):
         self.ensure_template()
         self.ensure_binary_template()
 
-        if isinstance(offset, tuple):
-            if len(offset) == 2:
-                offset = np.array((-offset[0], -offset[1], offset[0], offset[1]))
-            else:
-                offset = np.array(offset)
-        else:
-            offset = np.array((-3, -offset, 3, offset))
-        image = crop(image, offset + self.area, copy=False)
+        offset = self._parse_offset(offset)
+        area = offset + self.area
+        key = ('match_binary', tuple(offset), similarity, pyramid)
+        memo = self._memo_load(image, key, area)
+        if memo is not None:
+            return memo[0]
+        # graying and binarization, shared with other buttons on the same frame and area
+        image_binary = crop_convert(image, area, 'binary')
 
+        result = False
         if self.is_gif:
             for template in self.image_binary:
-                # graying
-                image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-                # binarization
-                _, image_binary = cv2.threshold(image_gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
-                # template matching
-                res = cv2.matchTemplate(template, image_binary, cv2.TM_CCOEFF_NORMED)
-                _, sim, _, point = cv2.minMaxLoc(res)
+                sim, point = match_template(image_binary, template, pyramid=pyramid)
                 self._button_offset = area_offset(self._button, offset[:2] + np.array(point))
                 if sim > similarity:
-                    return True
-            return False
+                    result = True
+                    break
         else:
-            # graying
-            image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            # binarization
-            _, image_binary = cv2.threshold(image_gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
-            # template matching
-            res = cv2.matchTemplate(self.image_binary, image_binary, cv2.TM_CCOEFF_NORMED)
-            _, sim, _, point = cv2.minMaxLoc(res)
+            sim, point = match_template(image_binary, self.image_binary, pyramid=pyramid)
             self._button_offset = area_offset(self._button, offset[:2] + np.array(point))
-            return sim > similarity
+            result = sim > similarity
+
+        return self._memo_save(image, key, result)
 
-    def match_luma(self, image, offset=30, similarity=0.85):
+    def match_luma(self, image, offset=30, similarity=0.85, pyramid=False):
         """
         Detects button by template matching under Y channel (Luminance)
 
@@ -290,6 +345,7 @@ class Button(Resource):
             image: Screenshot.
             offset (int, tuple): Detection area offset.
             similarity (float): 0-1. Similarity.
+            pyramid (bool): True to search coarse-to-fine, faster on large offsets. See match_template().
 
         Returns:
             bool.
@@ -297,29 +353,28 @@ class Button(Resource):
         self.ensure_template()
         self.ensure_luma_template()
 
-        if isinstance(offset, tuple):
-            if len(offset) == 2:
-                offset = np.array((-offset[0], -offset[1], offset[0], offset[1]))
-            else:
-                offset = np.array(offset)
-        else:
-            offset = np.array((-3, -offset, 3, offset))
-        image = crop(image, offset + self.area, copy=False)
+        offset = self._parse_offset(offset)
+        area = offset + self.area
+        key = ('match_luma', tuple(offset), similarity, pyramid)
+        memo = self._memo_load(image, key, area)
+        if memo is not None:
+            return memo[0]
+        image_luma = crop_convert(image, area, 'luma')
 
+        result = None
         if self.is_gif:
-            image_luma = rgb2luma(image)
             for template in self.image_luma:
-                res = cv2.matchTemplate(template, image_luma, cv2.TM_CCOEFF_NORMED)
-                _, sim, _, point = cv2.minMaxLoc(res)
+                sim, point = match_template(image_luma, template, pyramid=pyramid)
                 self._button_offset = area_offset(self._button, offset[:2] + np.array(point))
                 if sim > similarity:
-                    return True
+                    result = True
+                    break
         else:
-            image_luma = rgb2luma(image)
-            res = cv2.matchTemplate(self.image_luma, image_luma, cv2.TM_CCOEFF_NORMED)
-            _, sim, _, point = cv2.minMaxLoc(res)
+            sim, point = match_template(image_luma, self.image_luma, pyramid=pyramid)
             self._button_offset = area_offset(self._button, offset[:2] + np.array(point))
-            return sim > similarity
+            result = sim > similarity
+
+        return self._memo_save(image, key, result)
 
     def match_template_color(self, image, offset=(20, 20), similarity=0.85, threshold=30):
         """
@@ -155,11 +155,9 @@ class Template(Resource):
         Returns:
             bool: If matches.
         """
+        # graying and binarization
+        image_binary = crop_convert(image, None, 'binary')
         if self.is_gif:
-            # graying
-            image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            # binarization
-            _, image_binary = cv2.threshold(image_gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
             for template in self.image_binary:
                 # template matching
                 res = cv2.matchTemplate(template, image_binary, cv2.TM_CCOEFF_NORMED)
@@ -171,10 +169,6 @@ class Template(Resource):
             return False
 
         else:
-            # graying
-            image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            # binarization
-            _, image_binary = cv2.threshold(image_gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
             # template matching
             res = cv2.matchTemplate(self.image_binary, image_binary, cv2.TM_CCOEFF_NORMED)
             _, sim, _, _ = cv2.minMaxLoc(res)
@@ -183,7 +177,7 @@ class Template(Resource):
 
     def match_luma(self, image, similarity=0.85):
         if self.is_gif:
-            image = rgb2luma(image)
+            image = crop_convert(image, None, 'luma')
             for template in self.image_luma:
                 res = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
                 _, sim, _, _ = cv2.minMaxLoc(res)
@@ -235,7 +229,7 @@ class Template(Resource):
         return sim, button
 
     def match_luma_result(self, image, name=None):
-        image = rgb2luma(image)
+        image = crop_convert(image, None, 'luma')
         res = cv2.matchTemplate(image, self.image_luma, cv2.TM_CCOEFF_NORMED)
         _, sim, _, point = cv2.minMaxLoc(res)
         # print(self.file, sim)
@@ -776,6 +776,143 @@ def rgb2luma(image):
     return luma
 
 
+class FrameCache:
+    """
+    Caches derived from the latest screenshot, shared by all detections on the same frame.
+    Screenshot.screenshot() calls FRAME_CACHE.set() once a new frame is received,
+    all caches are bound to that image object and dropped on the next frame.
+    """
+    # Cost of building an integral image, relative to averaging the same amount of pixels with cv2.mean().
+    # Integral images are built in int32 with 3 channels, which is slower than a plain mean.
+    # See dev_tools/color_benchmark.py
+    INTEGRAL_COST = 4
+    # Cost of one get_color() call without integral image, in pixels.
+    # Cropping and calling cv2.mean() on a small area is about as slow as averaging 16000 pixels.
+    LOOKUP_OVERHEAD = 16000
+
+    # Frames are compared in tiles of this size, see area_unchanged()
+    TILE = 16
+
+    def __init__(self):
+        self.image = None
+        self.frame_id = 0
+        self.integral = None
+        self.lookup_cost = 0
+        # Key: (str, tuple), (method, area). Value: np.ndarray, see crop_convert()
+        self.conversions = {}
+        # Previous frame, to compare with
+        self.prev_image = None
+        # np.ndarray, shape (height // TILE, width // TILE), the last frame_id that each tile changed.
+        # None if unknown.
+        self.tile_changed_at = None
+        # If the current frame has been compared with previous frame
+        self.diff_done = False
+
+    def set(self, image):
+        """
+        Args:
+            image (np.ndarray): New screenshot.
+        """
+        if not self.diff_done:
+            # Changes on the last frame were never computed, history is lost
+            self.tile_changed_at = None
+        self.prev_image = self.image
+        self.image = image
+        self.frame_id += 1
+        self.integral = None
+        self.lookup_cost = 0
+        self.conversions = {}
+        self.diff_done = False
+
+    def _update_diff(self):
+        """
+        Compare current frame with previous frame in tiles.
+        Exact comparison, a tile is unchanged only if all pixels are the same.
+        """
+        if self.diff_done:
+            return
+        self.diff_done = True
+        image, prev = self.image, self.prev_image
+        tile = self.TILE
+        h, w = image.shape[:2]
+        if prev is None or prev.shape != image.shape or h % tile or w % tile:
+            self.tile_changed_at = None
+            return
+        shape = (h // tile, w // tile)
+        if self.tile_changed_at is None or self.tile_changed_at.shape != shape:
+            # Unknown history, assume everything changed on the previous frame
+            self.tile_changed_at = np.full(shape, self.frame_id - 1, dtype=np.int64)
+        diff = cv2.absdiff(image, prev)
+        changed = diff.reshape(shape[0], tile, shape[1], -1).max(axis=(1, 3)) > 0
+        self.tile_changed_at[changed] = self.frame_id
+
+    def area_unchanged(self, area, since):
+        """
+        Args:
+            area (tuple): (upper_left_x, upper_left_y, bottom_right_x, bottom_right_y)
+            since (int): A frame_id.
+
+        Returns:
+            bool: If pixels in area on the current frame are exactly the same as on frame `since`.
+                False if unknown.
+        """
+        if since >= self.frame_id:
+            return since == self.frame_id
+        self._update_diff()
+        changed_at = self.tile_changed_at
+        if changed_at is None:
+            return False
+        tile = self.TILE
+        th, tw = changed_at.shape
+        x1, y1, x2, y2 = area
+        x1 = limit_in(round(x1) // tile, 0, tw)
+        y1 = limit_in(round(y1) // tile, 0, th)
+        x2 = limit_in(-(-round(x2) // tile), 0, tw)
+        y2 = limit_in(-(-round(y2) // tile), 0, th)
+        region = changed_at[y1:y2, x1:x2]
+        if not region.size:
+            # Area outside of image is always black
+            return True
+        return region.max() <= since
+
+    def get_integral(self, image, pixels, lookups=1):
+        """
+        Get the integral image of a screenshot, if it's worth it.
+
+        Summed-area table makes any rectangle mean O(1), but building it costs about INTEGRAL_COST times
+        of averaging the whole image. On the current frame, table is built once the accumulated cost
+        of plain lookups exceeds the cost of building it, so a frame never costs more than twice the
+        better one of the two. On other images, table is built only if this single call is costly enough.
+
+        Args:
+            image (np.ndarray):
+            pixels (int): Total amount of pixels to average.
+            lookups (int): Number of areas.
+
+        Returns:
+            np.ndarray: Integral image, or None if not worth building.
+        """
+        cost = pixels + lookups * self.LOOKUP_OVERHEAD
+        build_cost = image.shape[0] * image.shape[1] * self.INTEGRAL_COST
+        if image is self.image:
+            integral = self.integral
+            if integral is not None:
+                return integral
+            self.lookup_cost += cost
+            if self.lookup_cost > build_cost:
+                integral = cv2.integral(image)
+                self.integral = integral
+                return integral
+            return None
+        else:
+            if cost > build_cost:
+                return cv2.integral(image)
+            return None
+
+
+FRAME_CACHE = FrameCache()
+
+
 def get_color(image, area):
     """Calculate the average color of a particular area of the image.
 
@@ -786,11 +923,203 @@ def get_color(image, area):
     Returns:
         tuple: (r, g, b)
     """
+    if image is FRAME_CACHE.image:
+        x1, y1, x2, y2 = area
+        integral = FRAME_CACHE.get_integral(image, pixels=abs((x2 - x1) * (y2 - y1)))
+        if integral is not None:
+            return integral_color(integral, area)
     temp = crop(image, area, copy=False)
     color = cv2.mean(temp)
     return color[:3]
 
 
+def integral_color(integral, area):
+    """
+    Calculate the average color of an area from an integral image.
+    Same as get_color(), areas outside of image are treated as black like crop() does.
+
+    Args:
+        integral (np.ndarray): Integral image from cv2.integral(), shape (height + 1, width + 1, channel)
+        area (tuple): (upper_left_x, upper_left_y, bottom_right_x, bottom_right_y)
+
+    Returns:
+        tuple: (r, g, b)
+    """
+    x1, y1, x2, y2 = area
+    x1 = round(x1)
+    y1 = round(y1)
+    x2 = round(x2)
+    y2 = round(y2)
+    if x2 <= x1 or y2 <= y1:
+        return 0., 0., 0.
+    shape = integral.shape
+    h = shape[0] - 1
+    w = shape[1] - 1
+    cx1 = limit_in(x1, 0, w)
+    cy1 = limit_in(y1, 0, h)
+    cx2 = limit_in(x2, cx1, w)
+    cy2 = limit_in(y2, cy1, h)
+    total = integral[cy2, cx2] - integral[cy1, cx2] - integral[cy2, cx1] + integral[cy1, cx1]
+    count = (x2 - x1) * (y2 - y1)
+    if len(shape) == 2:
+        # Grayscale image
+        return total / count, 0., 0.
+    r, g, b = total[:3] / count
+    return r, g, b
+
+
+def get_color_batch(image, areas):
+    """
+    Calculate the average color of multiple areas on the same image in one pass.
+    If an integral image is worth building (see FrameCache.get_integral()),
+    each area mean costs 4 lookups no matter how large it is.
+    Results are the same as calling get_color() on each area,
+    areas outside of image are treated as black like crop() does.
+
+    Args:
+        image (np.ndarray): Screenshot.
+        areas (list[tuple]): [(upper_left_x, upper_left_y, bottom_right_x, bottom_right_y), ...]
+
+    Returns:
+        np.ndarray: Shape (n, 3), average (r, g, b) of each area.
+    """
+    areas = np.round(np.array(areas, dtype=float).reshape(-1, 4)).astype(np.int64)
+    if not len(areas):
+        return np.zeros((0, 3), dtype=float)
+    pixels = int(np.sum(np.abs((areas[:, 2] - areas[:, 0]) * (areas[:, 3] - areas[:, 1]))))
+    integral = FRAME_CACHE.get_integral(image, pixels=pixels, lookups=len(areas))
+    if integral is None:
+        return np.array([cv2.mean(crop(image, area, copy=False))[:3] for area in areas], dtype=float)
+    return integral_mean(integral, areas)
+
+
+def integral_mean(integral, areas):
+    """
+    Args:
+        integral (np.ndarray): Integral image from cv2.integral(), shape (height + 1, width + 1, channel)
+        areas (np.ndarray): Shape (n, 4), int areas.
+
+    Returns:
+        np.ndarray: Shape (n, 3), average (r, g, b) of each area.
+    """
+    h, w = integral.shape[:2]
+    h, w = h - 1, w - 1
+    x1, y1, x2, y2 = areas.T
+    cx1 = np.clip(x1, 0, w)
+    cy1 = np.clip(y1, 0, h)
+    cx2 = np.clip(x2, cx1, w)
+    cy2 = np.clip(y2, cy1, h)
+    total = integral[cy2, cx2].astype(np.int64) - integral[cy1, cx2] - integral[cy2, cx1] + integral[cy1, cx1]
+    if total.ndim == 1:
+        # Grayscale image, get_color() gives (gray, 0, 0)
+        total = np.stack([total, np.zeros_like(total), np.zeros_like(total)], axis=1)
+    else:
+        total = total[:, :3]
+    # Pixels outside of image are counted as black
+    count = (x2 - x1) * (y2 - y1)
+    count = np.where((x2 > x1) & (y2 > y1), count, 0)
+    mean = np.zeros(total.shape, dtype=float)
+    np.divide(total, count[:, None], out=mean, where=count[:, None] > 0)
+    return mean
+
+
+def image_convert(image, method):
+    """
+    Args:
+        image (np.ndarray): Shape (height, width, channel)
+        method (str):
+            'gray', grayscale by cv2.COLOR_BGR2GRAY, as template matching used
+            'luma', Y channel in YUV color space, see rgb2luma()
+            'binary', gray with OTSU binarization
+
+    Returns:
+        np.ndarray: Shape (height, width)
+    """
+    if method == 'luma':
+        return rgb2luma(image)
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if method == 'gray':
+        return image
+    if method == 'binary':
+        _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        return image
+    raise ValueError(f'Unknown image convert method: {method}')
+
+
+def crop_convert(image, area, method):
+    """
+    Crop an area and convert it, results on the current frame are cached in FRAME_CACHE,
+    so buttons and templates that search the same area share one conversion.
+
+    Args:
+        image (np.ndarray): Screenshot.
+        area (tuple): Area to crop, or None for the whole image.
+        method (str): 'gray', 'luma', 'binary', see image_convert()
+
+    Returns:
+        np.ndarray: Shape (height, width). Don't modify it, it may be shared.
+    """
+    if area is not None:
+        area = tuple(int(round(x)) for x in area)
+    if image is not FRAME_CACHE.image:
+        if area is not None:
+            image = crop(image, area, copy=False)
+        return image_convert(image, method)
+
+    key = (method, area)
+    try:
+        return FRAME_CACHE.conversions[key]
+    except KeyError:
+        pass
+    if area is not None:
+        image = crop(image, area, copy=False)
+    image = image_convert(image, method)
+    FRAME_CACHE.conversions[key] = image
+    return image
+
+
+# Template matching on pyramid is used only if there are this many positions to search.
+PYRAMID_MIN_POSITIONS = 2500
+# Templates smaller than this on any side are too small to be downscaled.
+PYRAMID_MIN_TEMPLATE = 16
+
+
+def match_template(image, template, pyramid=False):
+    """
+    Template matching with cv2.TM_CCOEFF_NORMED, returns the best match.
+
+    Args:
+        image (np.ndarray): Image to search in.
+        template (np.ndarray):
+        pyramid (bool):
+            True to search coarse-to-fine, match on half size images first,
+            then refine at full size around the best coarse result.
+            Much faster on large search areas, but may miss templates with thin details.
+            Fallback to full search if images are too small to benefit.
+
+    Returns:
+        float, tuple[int, int]: Similarity, upper-left point of the best match.
+    """
+    if pyramid:
+        th, tw = template.shape[:2]
+        ih, iw = image.shape[:2]
+        if min(th, tw) >= PYRAMID_MIN_TEMPLATE and (ih - th + 1) * (iw - tw + 1) >= PYRAMID_MIN_POSITIONS:
+            res = cv2.matchTemplate(cv2.pyrDown(image), cv2.pyrDown(template), cv2.TM_CCOEFF_NORMED)
+            _, _, _, point = cv2.minMaxLoc(res)
+            # Refine in a small window at full size
+            x1 = limit_in(point[0] * 2 - 2, 0, iw - tw)
+            y1 = limit_in(point[1] * 2 - 2, 0, ih - th)
+            x2 = min(x1 + tw + 4, iw)
+            y2 = min(y1 + th + 4, ih)
+            res = cv2.matchTemplate(image[y1:y2, x1:x2], template, cv2.TM_CCOEFF_NORMED)
+            _, sim, _, point = cv2.minMaxLoc(res)
+            return sim, (point[0] + x1, point[1] + y1)
+
+    res = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+    _, sim, _, point = cv2.minMaxLoc(res)
+    return sim, point
+
+
 class ImageNotSupported(Exception):
     """
     Raised if we can't perform image calculation on this image
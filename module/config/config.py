@@ -82,6 +82,8 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
         # Modified arguments. Key: Argument path in yaml file. Value: Modified value.
         # All variable modifications will be record here and saved in method `save()`.
         self.modified = {}
+        # Modifications that differ from config file, file is written only if there are changes.
+        self.changed = {}
         # Key: Argument name in GeneratedConfig. Value: Path in `data`.
         self.bound = {}
         # If write after every variable modification.
@@ -123,11 +125,21 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
         self.save()
 
     def load(self):
-        self.data = self.read_file(self.config_name)
+        # Config file is read again only if it's modified by others
+        self.data = self.read_resident(self.config_name)
         self.config_override()
+        self.apply_modified()
 
+    def apply_modified(self):
+        """
+        Set `modified` into `data`, modifications that differ from config file are recorded in `changed`.
+        `data` is not compared, since it may have in-memory modifications such as config_override().
+        """
+        file_data = self.read_resident(self.config_name, copy=False)
         for path, value in self.modified.items():
             deep_set(self.data, keys=path, value=value)
+            if deep_get(file_data, keys=path, default=None) != value:
+                self.changed[path] = value
 
     def bind(self, func, func_list=None):
         """
@@ -264,14 +276,17 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
         if not self.modified:
             return False
 
-        for path, value in self.modified.items():
-            deep_set(self.data, keys=path, value=value)
+        self.apply_modified()
+        # Don't use self.modified = {}, that will create a new object.
+        self.modified.clear()
+        if not self.changed:
+            # Values are the same as config file, no need to write
+            return False
 
         logger.info(
-            f"Save config {filepath_config(self.config_name, mod_name)}, {dict_to_kv(self.modified)}"
+            f"Save config {filepath_config(self.config_name, mod_name)}, {dict_to_kv(self.changed)}"
         )
-        # Don't use self.modified = {}, that will create a new object.
-        self.modified.clear()
+        self.changed.clear()
         self.write_file(self.config_name, data=self.data)
 
     def update(self):
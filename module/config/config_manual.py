@@ -92,6 +92,9 @@ class ManualConfig:
     SCRCPY_FILEPATH_LOCAL = './bin/scrcpy/scrcpy-server-v1.20.jar'
     SCRCPY_FILEPATH_REMOTE = '/data/local/tmp/scrcpy-server-v1.20.jar'
 
+    # Folder of recorded session for Emulator_ScreenshotMethod and Emulator_ControlMethod 'Simulator'
+    SIMULATOR_SESSION = './log/simulator'
+
     MAATOUCH_FILEPATH_LOCAL = './bin/MaaTouch/maatouchsync'
     MAATOUCH_FILEPATH_REMOTE = '/data/local/tmp/maatouchsync'
 
@@ -193,6 +196,10 @@ class ManualConfig:
     MAP_WALK_USE_CURRENT_FLEET = False
     # Optimize walk path, reducing ambushes
     MAP_WALK_TURNING_OPTIMIZE = True
+    # Plan the order of enemies for the remaining battles before boss, reducing steps and ambushes,
+    # instead of choosing the enemy with the lowest weight and cost in each battle.
+    MAP_CLEAR_ROUTE_PLAN = False
+    MAP_CLEAR_ROUTE_PLAN_DEPTH = 4
     # Optimize swipe path, reducing swipes turn info clicks.
     MAP_SWIPE_OPTIMIZE = True
     # Swipe after boss appear. Could avoid map detection error when camera is on edge.
@@ -221,6 +228,10 @@ class ManualConfig:
     HOMO_CENTER_THRESHOLD = 0.8
     HOMO_CORNER_THRESHOLD = 0.8
     HOMO_RECTANGLE_THRESHOLD = 10
+    # Search free tile around the homo_loca of last detection,
+    # within HOMO_TRACK_WINDOW pixels, before searching the whole image.
+    HOMO_TRACK = True
+    HOMO_TRACK_WINDOW = 24
 
     HOMO_EDGE_DETECT = True
     HOMO_EDGE_HOUGHLINES_THRESHOLD = 180
@@ -562,6 +562,8 @@ class ConfigGenerator:
 
 
 class ConfigUpdater:
+    # Config files are ./config/{config_name}.json, or ./config/{config_name}.{mod_name}.json of mods
+    mod_name = 'alas'
     # source, target, (optional)convert_func
     redirection = [
         # ('OpsiDaily.OpsiDaily.BuySupply', 'OpsiShop.Scheduler.Enable'),
@@ -797,17 +799,57 @@ class ConfigUpdater:
         # self.write_file(config_name, new)
         return new
 
-    @staticmethod
-    def write_file(config_name, data, mod_name='alas'):
+    @cached_property
+    def resident(self):
+        """
+        Config files kept in memory by read_resident().
+        Key: file path. Value: (file signature, data)
+        """
+        return {}
+
+    def read_resident(self, config_name, copy=True):
+        """
+        Read and update config file, and keep it in memory.
+        File is read again only if it's modified by others, such as another Alas or the webui.
+
+        Data kept in memory is always the same as config file,
+        it's replaced only after write_file() succeeded.
+
+        Args:
+            config_name (str): ./config/{file}.json
+            copy (bool): True to return a copy that can be modified,
+                False to return the data kept in memory, which must not be modified.
+
+        Returns:
+            dict:
+        """
+        file = filepath_config(config_name, self.mod_name)
+        # Get signature before reading, so a modification during reading is read next time
+        signature = file_signature(file)
+        resident = self.resident.get(file)
+        if signature is not None and resident is not None and resident[0] == signature:
+            data = resident[1]
+        else:
+            data = self.read_file(config_name)
+            self.resident[file] = (signature, data)
+        return deepcopy(data) if copy else data
+
+    def write_file(self, config_name, data, mod_name=None):
         """
         Write config file.
 
         Args:
             config_name (str): ./config/{file}.json
             data (dict):
-            mod_name (str):
-        """
-        write_file(filepath_config(config_name, mod_name), data)
+            mod_name (str): Default to self.mod_name
+        """
+        if mod_name is None:
+            mod_name = self.mod_name
+        file = filepath_config(config_name, mod_name)
+        write_file(file, data)
+        if file in self.resident:
+            # Copy, caller may continue modifying data
+            self.resident[file] = (file_signature(file), deepcopy(data))
 
     @timer
     def update_file(self, config_name, is_template=False):
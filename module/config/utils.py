@@ -120,6 +120,22 @@ def write_file(file, data):
         print(f'Unsupported config file extension: {file}')
 
 
+def file_signature(file):
+    """
+    Args:
+        file (str):
+
+    Returns:
+        tuple: (st_mtime_ns, st_size, st_ino), changes if file is rewritten,
+            or None if file not exists.
+    """
+    try:
+        stat = os.stat(file)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
 def iter_folder(folder, is_dir=False, ext=None):
     """
     Args:
@@ -1,16 +1,206 @@
+import ctypes
+import ctypes.util
 import os
+import struct
+import sys
+import threading
+import time
 from datetime import datetime
 
-from module.config.utils import filepath_config, DEFAULT_TIME
+from module.config.deep import deep_iter_diff
+from module.config.utils import filepath_config, file_signature, DEFAULT_TIME
 from module.logger import logger
 
+# inotify events, see <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_CLOEXEC = os.O_CLOEXEC if hasattr(os, 'O_CLOEXEC') else 0
+IN_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+
+class FileWatcher:
+    # Interval to check file signatures if inotify is unavailable
+    poll_interval = 1
+
+    def __init__(self, folder):
+        """
+        Watch modifications of files in a folder.
+
+        On Linux, inotify events are read in a background thread, so waiting for a file costs nothing
+        until the file changes, and tokens are just counters of events.
+        On other platforms, or if inotify failed, file signatures are polled.
+
+        Folder is watched instead of files, because config files are written by atomic_write(),
+        which replaces the file with a new one.
+
+        Args:
+            folder (str):
+        """
+        self.folder = os.path.abspath(folder)
+        self.lock = threading.Condition()
+        # Key: file name. Value: number of events.
+        self.events = {}
+        # Increases if events are lost, all files are considered modified.
+        self.overflow = 0
+        self.inotify = self._inotify_start()
+
+    def _inotify_start(self):
+        """
+        Returns:
+            bool: If inotify started.
+        """
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+            wd = libc.inotify_add_watch(fd, self.folder.encode('utf-8'), IN_MASK)
+            if wd < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), 'inotify_add_watch failed')
+        except (OSError, AttributeError) as e:
+            logger.warning(f'inotify unavailable, poll config files instead: {e}')
+            return False
+
+        thread = threading.Thread(target=self._inotify_loop, args=(fd,), name='FileWatcher', daemon=True)
+        thread.start()
+        return True
+
+    def _inotify_loop(self, fd):
+        try:
+            while 1:
+                buffer = os.read(fd, 4096)
+                offset = 0
+                names = []
+                stopped = False
+                while offset < len(buffer):
+                    wd, mask, cookie, length = struct.unpack_from('iIII', buffer, offset)
+                    offset += 16
+                    name = buffer[offset:offset + length].rstrip(b'\0').decode('utf-8', errors='ignore')
+                    offset += length
+                    if mask & IN_Q_OVERFLOW:
+                        names.append(None)
+                    elif mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                        stopped = True
+                    elif name:
+                        names.append(name)
+                with self.lock:
+                    for name in names:
+                        if name is None:
+                            self.overflow += 1
+                        else:
+                            self.events[name] = self.events.get(name, 0) + 1
+                    self.lock.notify_all()
+                if stopped:
+                    break
+        except OSError as e:
+            logger.warning(f'inotify stopped: {e}')
+        finally:
+            os.close(fd)
+        # Folder is gone, fallback to polling
+        with self.lock:
+            self.inotify = False
+            self.lock.notify_all()
+
+    def _token(self, name):
+        return self.overflow, self.events.get(name, 0)
+
+    def token(self, file):
+        """
+        Args:
+            file (str): File in folder.
+
+        Returns:
+            tuple: A token that changes when file is modified.
+        """
+        if self.inotify:
+            with self.lock:
+                return self._token(os.path.basename(file))
+        else:
+            return file_signature(file)
+
+    def wait(self, file, token, timeout):
+        """
+        Wait until file is modified after `token` is taken.
+
+        Args:
+            file (str): File in folder.
+            token (tuple): From token().
+            timeout (int, float): Seconds.
+
+        Returns:
+            bool: True if file modified, False if timeout.
+        """
+        deadline = time.time() + timeout
+        name = os.path.basename(file)
+        with self.lock:
+            while self.inotify:
+                if self._token(name) != token:
+                    return True
+                remain = deadline - time.time()
+                if remain <= 0:
+                    return False
+                self.lock.wait(remain)
+
+        while 1:
+            if file_signature(file) != token:
+                return True
+            remain = deadline - time.time()
+            if remain <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remain))
+
+
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def get_file_watcher(folder='./config'):
+    """
+    Args:
+        folder (str):
+
+    Returns:
+        FileWatcher: Shared by everything in this process.
+    """
+    folder = os.path.abspath(folder)
+    with _watchers_lock:
+        watcher = _watchers.get(folder)
+        if watcher is None:
+            watcher = FileWatcher(folder)
+            _watchers[folder] = watcher
+        return watcher
+
 
 class ConfigWatcher:
     config_name = 'alas'
+    mod_name = 'alas'
     start_mtime = DEFAULT_TIME
+    start_token = None
+
+    @property
+    def config_file(self):
+        return filepath_config(self.config_name, self.mod_name)
 
     def start_watching(self) -> None:
         self.start_mtime = self.get_mtime()
+        self.start_token = self.get_token()
+
+    def get_token(self):
+        """
+        Returns:
+            tuple: A token that changes when config file is modified.
+        """
+        return get_file_watcher(os.path.dirname(self.config_file)).token(self.config_file)
 
     def get_mtime(self) -> datetime:
         """
@@ -20,14 +210,62 @@ class ConfigWatcher:
         mtime = datetime.fromtimestamp(timestamp).replace(microsecond=0)
         return mtime
 
+    def is_file_changed(self) -> bool:
+        """
+        Returns:
+            bool: Whether config file differs from the one last read or written by read_resident() and write_file().
+                Events of files written by this Alas itself are ignored by this.
+        """
+        resident = self.resident.get(self.config_file)
+        return resident is None or resident[0] != file_signature(self.config_file)
+
     def should_reload(self) -> bool:
         """
         Returns:
             bool: Whether the file has been modified and configs should reload
         """
-        mtime = self.get_mtime()
-        if mtime > self.start_mtime:
-            logger.info(f'Config "{self.config_name}" changed at {mtime}')
+        token = self.get_token()
+        if token == self.start_token:
+            return False
+        self.start_token = token
+        if self.is_file_changed():
+            logger.info(f'Config "{self.config_name}" changed at {self.get_mtime()}')
             return True
         else:
             return False
+
+    def wait_reload(self, timeout) -> bool:
+        """
+        Wait until config file is modified after start_watching().
+
+        Args:
+            timeout (int, float): Seconds.
+
+        Returns:
+            bool: Whether the file has been modified and configs should reload
+        """
+        watcher = get_file_watcher(os.path.dirname(self.config_file))
+        deadline = time.time() + timeout
+        while 1:
+            remain = deadline - time.time()
+            if remain <= 0 or not watcher.wait(self.config_file, token=self.start_token, timeout=remain):
+                return False
+            # Events are counted in another thread, an event of our own write_file() may arrive late.
+            # Take token before checking file, so modifications after that are still noticed.
+            self.start_token = watcher.token(self.config_file)
+            if self.is_file_changed():
+                logger.info(f'Config "{self.config_name}" changed at {self.get_mtime()}')
+                return True
+
+    def get_changed_keys(self):
+        """
+        Returns:
+            list[str]: Keys changed in config file, compared with data last read or written,
+                such as ['Commission.Scheduler.Enable']
+                The new file is kept by read_resident(), so the following load() doesn't read it again.
+        """
+        before = self.resident.get(self.config_file)
+        after = self.read_resident(self.config_name, copy=False)
+        if before is None:
+            return []
+        return ['.'.join(path) for path, _, _ in deep_iter_diff(before[1], after)]
@@ -2,6 +2,7 @@ from lxml import etree
 
 from module.base.timer import Timer
 from module.device.method.adb import Adb
+from module.device.method.simulator import Simulator
 from module.device.method.uiautomator_2 import Uiautomator2
 from module.device.method.utils import HierarchyButton
 from module.device.method.wsa import WSA
@@ -9,7 +10,7 @@ from module.exception import ScriptError
 from module.logger import logger
 
 
-class AppControl(Adb, WSA, Uiautomator2):
+class AppControl(Adb, WSA, Uiautomator2, Simulator):
     hierarchy: etree._Element
     _app_u2_family = ['uiautomator2', 'minitouch', 'scrcpy', 'MaaTouch', 'nemu_ipc']
     _hierarchy_interval = Timer(0.1)
@@ -18,6 +19,8 @@ class AppControl(Adb, WSA, Uiautomator2):
         method = self.config.Emulator_ControlMethod
         if self.is_wsa:
             package = self.app_current_wsa()
+        elif method == 'Simulator':
+            package = self.app_current_simulator()
         elif method in AppControl._app_u2_family:
             package = self.app_current_uiautomator2()
         else:
@@ -35,6 +38,8 @@ class AppControl(Adb, WSA, Uiautomator2):
         logger.info(f'App start: {self.package}')
         if self.config.Emulator_Serial == 'wsa-0':
             self.app_start_wsa(display=0)
+        elif method == 'Simulator':
+            self.app_start_simulator()
         elif method in AppControl._app_u2_family:
             self.app_start_uiautomator2()
         else:
@@ -43,7 +48,9 @@ class AppControl(Adb, WSA, Uiautomator2):
     def app_stop(self):
         method = self.config.Emulator_ControlMethod
         logger.info(f'App stop: {self.package}')
-        if method in AppControl._app_u2_family:
+        if method == 'Simulator':
+            self.app_stop_simulator()
+        elif method in AppControl._app_u2_family:
             self.app_stop_uiautomator2()
         else:
             self.app_stop_adb()
@@ -71,7 +78,10 @@ class AppControl(Adb, WSA, Uiautomator2):
         self._hierarchy_interval.reset()
 
         method = self.config.Emulator_ControlMethod
-        if method in AppControl._app_u2_family:
+        if method == 'Simulator':
+            # Recorded sessions have no hierarchy
+            self.hierarchy = etree.Element('hierarchy')
+        elif method in AppControl._app_u2_family:
             self.hierarchy = self.dump_hierarchy_uiautomator2()
         else:
             self.hierarchy = self.dump_hierarchy_adb()
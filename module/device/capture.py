@@ -0,0 +1,174 @@
+import threading
+import time
+
+import numpy as np
+
+from module.base.utils import copy_image
+from module.logger import logger
+
+
+class FrameRing:
+    def __init__(self, size=3):
+        """
+        A ring of preallocated frame buffers, written by a capture thread and read by the task thread.
+
+        Writer copies frames into buffers allocated once, so continuous capturing doesn't allocate
+        a new array for every received frame. Reader gets the newest frame, the slot being read is
+        pinned so writer won't overwrite it, which needs at least 3 slots:
+        one pinned by reader, one holding the newest frame, one being written.
+
+        Args:
+            size (int): Number of slots.
+        """
+        self.size = max(size, 3)
+        self.buffers = [None] * self.size
+        self.seq = [0] * self.size
+        self.timestamp = [0.] * self.size
+        # Index of the slot having the newest frame, -1 for no frame yet
+        self.latest = -1
+        # Index of the slot being read, -1 for no reader
+        self.reading = -1
+        # Sequence number of the newest frame
+        self.latest_seq = 0
+        # Exception raised in capture thread, will be raised in reader
+        self.error = None
+        self.cond = threading.Condition()
+
+    def _acquire(self, image):
+        """
+        Get a free slot to write, reallocate if shape changed.
+
+        Returns:
+            int: Slot index.
+        """
+        with self.cond:
+            for index in range(self.size):
+                if index != self.latest and index != self.reading:
+                    break
+        buffer = self.buffers[index]
+        if buffer is None or buffer.shape != image.shape or buffer.dtype != image.dtype:
+            self.buffers[index] = np.empty_like(image)
+        return index
+
+    def write(self, image, timestamp=None):
+        """
+        Copy a frame into ring.
+
+        Args:
+            image (np.ndarray):
+            timestamp (float): Time that frame was received, default to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        index = self._acquire(image)
+        np.copyto(self.buffers[index], image)
+        with self.cond:
+            self.latest_seq += 1
+            self.seq[index] = self.latest_seq
+            self.timestamp[index] = timestamp
+            self.latest = index
+            self.cond.notify_all()
+
+    def write_error(self, error):
+        """
+        Args:
+            error (BaseException): Exception raised in capture thread.
+        """
+        with self.cond:
+            self.error = error
+            self.cond.notify_all()
+
+    def read(self, after=0, since=0., timeout=5):
+        """
+        Read the newest frame that is newer than `after`, and captured after `since`.
+
+        Args:
+            after (int): Sequence number of the last consumed frame.
+            since (float): Timestamp, frames captured before it are outdated,
+                such as frames captured before the last click.
+            timeout (int, float): Seconds to wait for a new frame.
+
+        Returns:
+            tuple[int, float, np.ndarray]: Sequence number, timestamp, and a copy of the frame.
+                Frame is copied because callers may keep references of old screenshots.
+                Or None if timeout.
+
+        Raises:
+            Exception: If capture thread died with an exception.
+        """
+        with self.cond:
+            if not self.cond.wait_for(
+                    lambda: (self.latest_seq > after and self.timestamp[self.latest] >= since)
+                            or self.error is not None,
+                    timeout=timeout):
+                return None
+            if self.error is not None:
+                raise self.error
+            index = self.latest
+            self.reading = index
+            seq, timestamp = self.seq[index], self.timestamp[index]
+        try:
+            image = copy_image(self.buffers[index])
+        finally:
+            with self.cond:
+                self.reading = -1
+        return seq, timestamp, image
+
+
+class CaptureThread:
+    def __init__(self, name, func, interval=0.):
+        """
+        Call a screenshot method on a background thread continuously, and put frames into a FrameRing.
+
+        Args:
+            name (str): Name of the screenshot method.
+            func (callable): Screenshot method, returns np.ndarray.
+            interval (int, float): Minimum seconds between two captures, can be changed while running.
+                Methods that block until a new frame arrives, like scrcpy, can use 0.
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.ring = FrameRing()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f'CaptureThread-{name}', daemon=True)
+
+    def __str__(self):
+        return f'CaptureThread({self.name})'
+
+    def start(self):
+        logger.info(f'{self} start')
+        self.thread.start()
+
+    def stop(self, timeout=2):
+        self._stop.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+        logger.info(f'{self} stopped')
+
+    def is_alive(self):
+        return self.thread.is_alive() and not self._stop.is_set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.time()
+            try:
+                image = self.func()
+            except BaseException as e:
+                # Re-raise in reader, let the task thread handle it
+                self.ring.write_error(e)
+                return
+            if self._stop.is_set():
+                return
+            # Frame may be captured at any time during the call, use the start time to be safe
+            self.ring.write(image, timestamp=start)
+            if self.interval:
+                cost = time.time() - start
+                if cost < self.interval:
+                    self._stop.wait(self.interval - cost)
+
+    def read(self, after=0, since=0., timeout=5):
+        """
+        See FrameRing.read()
+        """
+        return self.ring.read(after=after, since=since, timeout=timeout)
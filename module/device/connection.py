@@ -15,7 +15,7 @@ from module.base.decorator import Config, cached_property, del_cached_property,
 from module.base.timer import Timer
 from module.base.utils import ensure_time
 from module.config.deep import deep_get
-from module.config.server import VALID_CHANNEL_PACKAGE, VALID_PACKAGE, set_server
+from module.config.server import VALID_CHANNEL_PACKAGE, VALID_PACKAGE, set_server, to_package
 from module.device.connection_attr import ConnectionAttr
 from module.device.env import IS_LINUX, IS_MACINTOSH, IS_WINDOWS
 from module.device.method.pool import WORKER_POOL
@@ -113,6 +113,16 @@ class Connection(ConnectionAttr):
             config (AzurLaneConfig, str): Name of the user config under ./config
         """
         super().__init__(config)
+        if self.is_simulator:
+            # No device to connect
+            self.package = self.config.Emulator_PackageName
+            if self.package == 'auto':
+                self.package = to_package(self.config.SERVER)
+            else:
+                set_server(self.package)
+            logger.attr('AdbDevice', 'Simulator')
+            logger.attr('PackageName', self.package)
+            return
         if not self.is_over_http:
             self.detect_device()
 
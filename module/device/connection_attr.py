@@ -211,6 +211,12 @@ class ConnectionAttr:
     def is_local_network_device(self):
         return bool(re.match(r'192\.168\.\d+\.\d+:\d+', self.serial))
 
+    @cached_property
+    def is_simulator(self):
+        # Offline device, see module/device/method/simulator.py
+        return self.config.Emulator_ScreenshotMethod == 'Simulator' \
+            and self.config.Emulator_ControlMethod == 'Simulator'
+
     @cached_property
     def is_over_http(self):
         return bool(re.match(r"^https?://", self.serial))
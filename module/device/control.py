@@ -1,3 +1,5 @@
+import time
+
 from module.base.button import Button
 from module.base.decorator import cached_property
 from module.base.timer import Timer
@@ -7,14 +9,22 @@ from module.device.method.maatouch import MaaTouch
 from module.device.method.minitouch import Minitouch
 from module.device.method.nemu_ipc import NemuIpc
 from module.device.method.scrcpy import Scrcpy
+from module.device.method.simulator import Simulator
 from module.logger import logger
 
 
-class Control(Hermit, Minitouch, Scrcpy, MaaTouch, NemuIpc):
+class Control(Hermit, Minitouch, Scrcpy, MaaTouch, NemuIpc, Simulator):
     def handle_control_check(self, button):
         # Will be overridden in Device
         pass
 
+    def control_done(self):
+        """
+        Record the time of control action,
+        frames in capture thread captured before it are outdated, see Screenshot.screenshot_capture()
+        """
+        self._control_time = time.time()
+
     @cached_property
     def click_methods(self):
         return {
@@ -24,6 +34,7 @@ class Control(Hermit, Minitouch, Scrcpy, MaaTouch, NemuIpc):
             'Hermit': self.click_hermit,
             'MaaTouch': self.click_maatouch,
             'nemu_ipc': self.click_nemu_ipc,
+            'Simulator': self.click_simulator,
         }
 
     def click(self, button, control_check=True):
@@ -45,6 +56,7 @@ class Control(Hermit, Minitouch, Scrcpy, MaaTouch, NemuIpc):
             self.click_adb
         )
         method(x, y)
+        self.control_done()
 
     def multi_click(self, button, n, interval=(0.1, 0.2)):
         self.handle_control_check(button)
@@ -82,8 +94,11 @@ class Control(Hermit, Minitouch, Scrcpy, MaaTouch, NemuIpc):
             self.long_click_maatouch(x, y, duration)
         elif method == 'nemu_ipc':
             self.long_click_nemu_ipc(x, y, duration)
+        elif method == 'Simulator':
+            self.long_click_simulator(x, y, duration)
         else:
             self.swipe_adb((x, y), (x, y), duration)
+        self.control_done()
 
     def swipe(self, p1, p2, duration=(0.1, 0.2), name='SWIPE', distance_check=True):
         self.handle_control_check(name)
@@ -92,7 +107,7 @@ class Control(Hermit, Minitouch, Scrcpy, MaaTouch, NemuIpc):
         method = self.config.Emulator_ControlMethod
         if method == 'uiautomator2':
             logger.info('Swipe %s -> %s, %s' % (point2str(*p1), point2str(*p2), duration))
-        elif method in ['minitouch', 'MaaTouch', 'scrcpy', 'nemu_ipc']:
+        elif method in ['minitouch', 'MaaTouch', 'scrcpy', 'nemu_ipc', 'Simulator']:
             logger.info('Swipe %s -> %s' % (point2str(*p1), point2str(*p2)))
         else:
             # ADB needs to be slow, or swipe doesn't work
@@ -116,8 +131,11 @@ class Control(Hermit, Minitouch, Scrcpy, MaaTouch, NemuIpc):
             self.swipe_maatouch(p1, p2)
         elif method == 'nemu_ipc':
             self.swipe_nemu_ipc(p1, p2)
+        elif method == 'Simulator':
+            self.swipe_simulator(p1, p2)
         else:
             self.swipe_adb(p1, p2, duration=duration)
+        self.control_done()
 
     def swipe_vector(self, vector, box=(123, 159, 1175, 628), random_range=(0, 0, 0, 0), padding=15,
                      duration=(0.1, 0.2), whitelist_area=None, blacklist_area=None, name='SWIPE', distance_check=True):
@@ -167,8 +185,11 @@ class Control(Hermit, Minitouch, Scrcpy, MaaTouch, NemuIpc):
             self.drag_maatouch(p1, p2, point_random=point_random)
         elif method == 'nemu_ipc':
             self.drag_nemu_ipc(p1, p2, point_random=point_random)
+        elif method == 'Simulator':
+            self.drag_simulator(p1, p2, point_random=point_random)
         else:
             logger.warning(f'Control method {method} does not support drag well, '
                            f'falling back to ADB swipe may cause unexpected behaviour')
             self.swipe_adb(p1, p2, duration=ensure_time(swipe_duration * 2))
             self.click(Button(area=(), color=(), button=area_offset(point_random, p2), name=name), False)
+        self.control_done()
@@ -207,6 +207,8 @@ class Device(Screenshot, Control, AppControl):
         return super().dump_hierarchy()
 
     def release_during_wait(self):
+        # Capture thread keeps taking screenshots, stop it first
+        self.screenshot_capture_stop()
         # Scrcpy server is still sending video stream,
         # stop it during wait
         if self.config.Emulator_ScreenshotMethod == 'scrcpy':
@@ -105,6 +105,26 @@ class Scrcpy(ScrcpyCore, Uiautomator2):
                     screenshot = self._scrcpy_last_frame
                     return screenshot
 
+    @retry
+    def capture_scrcpy(self):
+        """
+        Same as screenshot_scrcpy() but without holding control socket lock,
+        for capture thread that calls it continuously, so control won't be starved.
+        """
+        self._scrcpy_resolution_check()
+        self.scrcpy_ensure_running()
+
+        # Wait new frame
+        now = time.time()
+        while 1:
+            time.sleep(0.001)
+            thread = self._scrcpy_stream_loop_thread
+            if thread is None or not thread.is_alive():
+                raise ScrcpyError('_scrcpy_stream_loop_thread died')
+            if self._scrcpy_last_frame_time > now:
+                # no copy, capture thread copies it into frame ring
+                return self._scrcpy_last_frame
+
     @retry
     def click_scrcpy(self, x, y):
         self.scrcpy_ensure_running()
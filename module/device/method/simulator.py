@@ -0,0 +1,195 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from module.base.decorator import cached_property
+from module.base.utils import load_image, point_in_area
+from module.device.connection import Connection
+from module.exception import RequestHumanTakeover
+from module.logger import logger
+
+
+class SimulatorState:
+    def __init__(self, name, image, clicks=(), swipes=(), after=None):
+        """
+        Args:
+            name (str): State name, such as page name `page_main`.
+            image (np.ndarray): Screenshot of this state.
+            clicks (list[tuple[tuple, str]]): Clicks in area go to state, [(area, state), ...]
+            swipes (list[tuple[tuple, str]]): Swipes starting in area go to state.
+            after (tuple[int, str]): Go to state after taking some screenshots, (frames, state).
+                Such as loading screens and animations.
+        """
+        self.name = name
+        self.image = image
+        self.clicks = list(clicks)
+        self.swipes = list(swipes)
+        self.after = after
+
+    def __str__(self):
+        return self.name
+
+
+class SimulatorSession:
+    def __init__(self, folder):
+        """
+        A recorded session, screenshots keyed by state, and state transitions on clicks.
+
+        Session is a folder of screenshots and a `session.json` like:
+            {
+                "start": "page_main",
+                "states": {
+                    "page_main": {
+                        "image": "page_main.png",
+                        "clicks": [{"area": [1080, 590, 1240, 690], "state": "page_reward"}],
+                        "swipes": [],
+                        "after": {"frames": 3, "state": "page_main"}
+                    }
+                }
+            }
+        "clicks", "swipes" and "after" are optional.
+        Clicks that don't match any area keep the current state, as clicking blank areas in game.
+
+        Args:
+            folder (str):
+        """
+        self.folder = folder
+        file = os.path.join(folder, 'session.json')
+        if not os.path.exists(file):
+            logger.critical(f'Simulator session not found: {file}')
+            raise RequestHumanTakeover
+        with open(file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        # Key: state name. Value: SimulatorState
+        self.states = {}
+        for name, state in data['states'].items():
+            after = state.get('after')
+            self.states[name] = SimulatorState(
+                name=name,
+                image=load_image(os.path.join(folder, state['image'])),
+                clicks=[(tuple(row['area']), row['state']) for row in state.get('clicks', [])],
+                swipes=[(tuple(row['area']), row['state']) for row in state.get('swipes', [])],
+                after=(int(after['frames']), after['state']) if after else None,
+            )
+        self.start = data['start']
+        self.state = self.states[self.start]
+        # Screenshots taken in current state
+        self.frames = 0
+
+        # Statistics
+        self.screenshots = 0
+        self.clicks = 0
+        self.missed = 0
+        self.transitions = 0
+        self.start_time = time.perf_counter()
+        self.start_cpu = time.process_time()
+        # CPU time between two screenshots, which is the cost of task logic in one iteration
+        self.iteration_cpu = []
+        self._last_cpu = None
+
+    def goto(self, name):
+        """
+        Args:
+            name (str): State name.
+        """
+        if name not in self.states:
+            logger.warning(f'Simulator state {name} not in session, stay at {self.state}')
+            return
+        logger.info(f'Simulator state: {self.state} -> {name}')
+        self.state = self.states[name]
+        self.frames = 0
+        self.transitions += 1
+
+    def screenshot(self):
+        """
+        Returns:
+            np.ndarray: Screenshot of current state, a copy that can be modified.
+        """
+        cpu = time.process_time()
+        if self._last_cpu is not None:
+            self.iteration_cpu.append(cpu - self._last_cpu)
+        self._last_cpu = cpu
+
+        self.screenshots += 1
+        self.frames += 1
+        image = self.state.image.copy()
+        if self.state.after is not None and self.frames >= self.state.after[0]:
+            self.goto(self.state.after[1])
+        return image
+
+    def click(self, x, y):
+        self.clicks += 1
+        for area, state in self.state.clicks:
+            if point_in_area((x, y), area):
+                self.goto(state)
+                return True
+        self.missed += 1
+        return False
+
+    def swipe(self, p1, p2):
+        for area, state in self.state.swipes:
+            if point_in_area(p1, area):
+                self.goto(state)
+                return True
+        return False
+
+    def report(self):
+        """
+        Log statistics of the session.
+        """
+        cost = time.perf_counter() - self.start_time
+        cpu = time.process_time() - self.start_cpu
+        logger.hr('Simulator report', level=2)
+        logger.attr('State', self.state)
+        logger.attr('Screenshots', self.screenshots)
+        logger.attr('Clicks', f'{self.clicks}, {self.missed} missed, {self.transitions} transitions')
+        logger.attr('Time', f'{round(cost, 3)}s, CPU {round(cpu, 3)}s')
+        if self.iteration_cpu:
+            iteration = np.array(self.iteration_cpu) * 1000
+            logger.attr('Iteration CPU', f'mean {round(float(np.mean(iteration)), 2)}ms, '
+                                         f'p50 {round(float(np.percentile(iteration, 50)), 2)}ms, '
+                                         f'p95 {round(float(np.percentile(iteration, 95)), 2)}ms')
+
+
+class Simulator(Connection):
+    """
+    Offline device that serves screenshots from a recorded session, see SimulatorSession.
+    Set both Emulator_ScreenshotMethod and Emulator_ControlMethod to 'Simulator' to run without ADB,
+    session folder is SIMULATOR_SESSION in config_manual.
+    """
+
+    @cached_property
+    def simulator(self) -> SimulatorSession:
+        logger.info(f'Loading simulator session: {self.config.SIMULATOR_SESSION}')
+        return SimulatorSession(self.config.SIMULATOR_SESSION)
+
+    def screenshot_simulator(self):
+        return self.simulator.screenshot()
+
+    def click_simulator(self, x, y):
+        self.simulator.click(x, y)
+
+    def long_click_simulator(self, x, y, duration=1.0):
+        self.simulator.click(x, y)
+
+    def swipe_simulator(self, p1, p2):
+        self.simulator.swipe(p1, p2)
+
+    def drag_simulator(self, p1, p2, point_random=(-10, -10, 10, 10)):
+        self.simulator.swipe(p1, p2)
+
+    def app_current_simulator(self):
+        return self.package
+
+    def app_start_simulator(self):
+        # Restart from the beginning of the session
+        self.simulator.goto(self.simulator.start)
+
+    def app_stop_simulator(self):
+        pass
+
+    def simulator_report(self):
+        self.simulator.report()
@@ -0,0 +1,243 @@
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+from module.base.utils import save_image
+from module.logger import logger
+
+
+class RecordedFrame:
+    __slots__ = ('time', 'image', 'data', 'nbytes', 'evicted')
+
+    def __init__(self, time, image):
+        """
+        Args:
+            time (datetime): Time that screenshot was taken.
+            image (np.ndarray): Raw screenshot, will be released after encoded.
+        """
+        self.time = time
+        self.image = image
+        # Encoded PNG bytes
+        self.data = None
+        # Bytes counted in the budget
+        self.nbytes = image.nbytes
+        self.evicted = False
+
+
+def encode_image(image):
+    """
+    Encode an RGB image to PNG bytes.
+
+    Time cost of a 1280*720 screenshot:
+        encode_image(image)            ~10ms
+        Image.fromarray(image).save()  ~60ms
+
+    Args:
+        image (np.ndarray):
+
+    Returns:
+        bytes:
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    _, data = cv2.imencode('.png', image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    return data.tobytes()
+
+
+def decode_image(data):
+    """
+    Args:
+        data (bytes): Encoded by encode_image()
+
+    Returns:
+        np.ndarray: RGB image.
+    """
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return image
+
+
+class ScreenshotRecorder:
+    def __init__(self, length=60, budget=64):
+        """
+        Keep the last screenshots in memory, to be saved when error occurs.
+
+        Screenshots are PNG encoded on a background thread, so recording costs a reference
+        on the task thread, and a recorded screenshot costs ~0.5MB instead of 2.7MB.
+        A screenshot identical to the previous one shares its encoded bytes,
+        which is common when the game gets stuck.
+        Oldest screenshots are dropped when either `length` or `budget` is exceeded.
+
+        Args:
+            length (int): Max number of screenshots.
+            budget (int, float): Max memory usage in MB.
+        """
+        self.length = max(int(length), 1)
+        self.budget = int(budget * 1024 * 1024)
+        self.frames = deque()
+        # Sum of RecordedFrame.nbytes
+        self.nbytes = 0
+        self.cond = threading.Condition()
+        self.thread = None
+        # Last encoded raw image and its bytes, accessed by encoding thread only
+        self._last_image = None
+        self._last_data = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __str__(self):
+        return f'ScreenshotRecorder(frames={len(self.frames)}, size={round(self.nbytes / 1048576, 1)}MB)'
+
+    def append(self, time, image):
+        """
+        Args:
+            time (datetime):
+            image (np.ndarray): Screenshot, must not be modified inplace afterwards.
+        """
+        with self.cond:
+            self.frames.append(RecordedFrame(time, image))
+            self.nbytes += image.nbytes
+            self._evict()
+            self.cond.notify_all()
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name='ScreenshotRecorder', daemon=True)
+            self.thread.start()
+
+    def _evict(self):
+        # Keep at least the newest screenshot even if it's over budget
+        while len(self.frames) > self.length or (self.nbytes > self.budget and len(self.frames) > 1):
+            frame = self.frames.popleft()
+            frame.evicted = True
+            following = self.frames[0]
+            if frame.data is not None and following.data is frame.data:
+                # Bytes are still referenced by the following frame, transfer the cost
+                following.nbytes += frame.nbytes
+            else:
+                self.nbytes -= frame.nbytes
+
+    def _pending(self):
+        for frame in self.frames:
+            if frame.data is None:
+                return frame
+        return None
+
+    def _encode(self, frame):
+        image = frame.image
+        if self._last_image is not None and self._last_image.shape == image.shape \
+                and np.array_equal(self._last_image, image):
+            data, nbytes = self._last_data, 0
+        else:
+            data = encode_image(image)
+            nbytes = len(data)
+        self._last_image, self._last_data = image, data
+        return data, nbytes
+
+    def _run(self):
+        while 1:
+            with self.cond:
+                if not self.cond.wait_for(self._pending, timeout=60):
+                    # Exit when idle, restarted on next append()
+                    self.thread = None
+                    self._last_image = self._last_data = None
+                    return
+                frame = self._pending()
+            try:
+                data, nbytes = self._encode(frame)
+            except Exception as e:
+                logger.warning(f'{self} failed to encode screenshot: {e}')
+                with self.cond:
+                    if not frame.evicted:
+                        frame.evicted = True
+                        self.frames.remove(frame)
+                        self.nbytes -= frame.nbytes
+                continue
+            with self.cond:
+                if frame.evicted:
+                    continue
+                if nbytes == 0:
+                    index = self.frames.index(frame)
+                    if index == 0 or self.frames[index - 1].data is not data:
+                        # Bytes were shared with an evicted frame, count them here
+                        nbytes = len(data)
+                frame.data = data
+                frame.image = None
+                self.nbytes += nbytes - frame.nbytes
+                frame.nbytes = nbytes
+                self._evict()
+                self.cond.notify_all()
+
+    def flush(self, timeout=10):
+        """
+        Wait until all screenshots are encoded.
+        Screenshots still not encoded after timeout will be saved from raw images.
+
+        Returns:
+            bool: If all encoded.
+        """
+        with self.cond:
+            if self.thread is None:
+                return self._pending() is None
+            return self.cond.wait_for(lambda: self._pending() is None, timeout=timeout)
+
+    def __iter__(self):
+        """
+        Yields:
+            dict: {'time': datetime, 'image': np.ndarray}
+        """
+        with self.cond:
+            frames = [(frame.time, frame.image, frame.data) for frame in self.frames]
+        for time, image, data in frames:
+            if data is not None:
+                image = decode_image(data)
+            yield {'time': time, 'image': image}
+
+    def save(self, folder, handle=None):
+        """
+        Save screenshots into folder as `{%Y-%m-%d_%H-%M-%S-%f}.png`.
+
+        Encoded bytes are written to file directly, PNG encoding is done only
+        if `handle` modified the screenshot.
+
+        Args:
+            folder (str):
+            handle (callable): Function to process screenshots before saving, receives and returns np.ndarray.
+                Should return the same object if nothing modified, like handle_sensitive_image().
+
+        Returns:
+            int: Number of screenshots saved.
+        """
+        self.flush()
+        with self.cond:
+            frames = [(frame.time, frame.image, frame.data) for frame in self.frames]
+
+        last_data, last_file = None, None
+        for time, image, data in frames:
+            file = f'{folder}/{time.strftime("%Y-%m-%d_%H-%M-%S-%f")}.png'
+            encoded = data
+            if data is not None:
+                if data is last_data and last_file is not None:
+                    # Identical to the previous screenshot, copy file
+                    with open(last_file, 'rb') as src, open(file, 'wb') as dst:
+                        dst.write(src.read())
+                    continue
+                if handle is not None:
+                    image = decode_image(data)
+                    processed = handle(image)
+                    if processed is not image:
+                        data, image = None, processed
+            else:
+                if handle is not None:
+                    image = handle(image)
+
+            if data is not None:
+                with open(file, 'wb') as f:
+                    f.write(data)
+            else:
+                save_image(image, file)
+            last_data, last_file = encoded, file
+
+        return len(frames)
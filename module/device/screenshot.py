@@ -1,6 +1,5 @@
 import os
 import time
-from collections import deque
 from datetime import datetime
 
 import cv2
@@ -9,25 +8,39 @@ from PIL import Image
 
 from module.base.decorator import cached_property
 from module.base.timer import Timer
-from module.base.utils import get_color, image_size, limit_in, save_image
+from module.base.utils import FRAME_CACHE, get_color, image_size, limit_in, save_image
+from module.device.capture import CaptureThread
 from module.device.method.adb import Adb
 from module.device.method.ascreencap import AScreenCap
 from module.device.method.droidcast import DroidCast
 from module.device.method.ldopengl import LDOpenGL
 from module.device.method.nemu_ipc import NemuIpc
 from module.device.method.scrcpy import Scrcpy
+from module.device.method.simulator import Simulator
 from module.device.method.wsa import WSA
+from module.device.recorder import ScreenshotRecorder
 from module.exception import RequestHumanTakeover, ScriptError
 from module.logger import logger
 
 
-class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
+class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL, Simulator):
     _screen_size_checked = False
     _screen_black_checked = False
     _minicap_uninstalled = False
     _screenshot_interval = Timer(0.1)
     _last_save_time = {}
     image: np.ndarray
+    # Screenshot methods that receive frames continuously,
+    # can be captured on a background thread if Emulator_ScreenshotCaptureThread enabled
+    CAPTURE_THREAD_METHODS = ['scrcpy', 'nemu_ipc']
+    _capture_thread = None
+    # Sequence number of the last frame got from capture thread
+    _capture_seq = 0
+    # Minimum seconds between two captures in capture thread,
+    # methods like nemu_ipc return immediately and would take a whole CPU core without it
+    CAPTURE_INTERVAL_MIN = 0.05
+    # Time of the last control action, set in Control, frames captured before it are outdated
+    _control_time = 0.
 
     @cached_property
     def screenshot_methods(self):
@@ -42,6 +55,7 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
             'scrcpy': self.screenshot_scrcpy,
             'nemu_ipc': self.screenshot_nemu_ipc,
             'ldopengl': self.screenshot_ldopengl,
+            'Simulator': self.screenshot_simulator,
         }
 
     @cached_property
@@ -61,8 +75,12 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
                 method = self.screenshot_method_override
             else:
                 method = self.config.Emulator_ScreenshotMethod
-            method = self.screenshot_methods.get(method, self.screenshot_adb)
-            self.image = method()
+            if self.config.Emulator_ScreenshotCaptureThread and method in self.CAPTURE_THREAD_METHODS:
+                self.image = self.screenshot_capture(method)
+            else:
+                self.screenshot_capture_stop()
+                method = self.screenshot_methods.get(method, self.screenshot_adb)
+                self.image = method()
 
             if self.config.Emulator_ScreenshotDedithering:
                 # This will take 40-60ms
@@ -70,15 +88,86 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
             self.image = self._handle_orientated_image(self.image)
 
             if self.config.Error_SaveError:
-                self.screenshot_deque.append({'time': datetime.now(), 'image': self.image})
+                self.screenshot_recorder.append(datetime.now(), self.image)
 
             if self.check_screen_size() and self.check_screen_black():
                 break
             else:
                 continue
 
+        # Bind per-frame caches, such as the integral image used in get_color()
+        FRAME_CACHE.set(self.image)
         return self.image
 
+    @cached_property
+    def capture_methods(self):
+        return {
+            # Don't call screenshot_scrcpy() in a loop, it holds control socket lock while waiting frames
+            'scrcpy': self.capture_scrcpy,
+            'nemu_ipc': self.screenshot_nemu_ipc,
+        }
+
+    def screenshot_capture(self, method):
+        """
+        Get the newest frame from capture thread, start the thread if not running.
+
+        Args:
+            method (str): Screenshot method in CAPTURE_THREAD_METHODS
+
+        Returns:
+            np.ndarray:
+        """
+        thread = self._capture_thread
+        if thread is None or thread.name != method or not thread.is_alive():
+            self.screenshot_capture_stop()
+            thread = CaptureThread(name=method, func=self.capture_methods[method])
+            thread.start()
+            self._capture_thread = thread
+            self._capture_seq = 0
+        thread.interval = max(self._screenshot_interval.limit, self.CAPTURE_INTERVAL_MIN)
+
+        try:
+            result = thread.read(after=self._capture_seq, since=self._control_time, timeout=5)
+        except Exception:
+            # Capture thread died, exception raised from screenshot method
+            self.screenshot_capture_stop()
+            raise
+        if result is None:
+            logger.warning(f'{thread} has no new frame in 5s, restart it and capture directly')
+            self.screenshot_capture_stop()
+            return self.screenshot_methods[method]()
+
+        self._capture_seq, _, image = result
+        return image
+
+    def screenshot_capture_stop(self):
+        """
+        Stop capture thread if running.
+        """
+        if self._capture_thread is not None:
+            self._capture_thread.stop()
+            self._capture_thread = None
+            self._capture_seq = 0
+
+    @property
+    def frame_id(self):
+        """
+        Returns:
+            int: Sequence number of the current screenshot, increases on every screenshot()
+        """
+        return FRAME_CACHE.frame_id
+
+    def image_unchanged(self, area, since):
+        """
+        Args:
+            area (tuple): (upper_left_x, upper_left_y, bottom_right_x, bottom_right_y)
+            since (int): A previous frame_id.
+
+        Returns:
+            bool: If pixels in area are exactly the same since frame `since`.
+        """
+        return FRAME_CACHE.area_unchanged(area, since=since)
+
     @property
     def has_cached_image(self):
         return hasattr(self, 'image') and self.image is not None
@@ -110,15 +199,22 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
         return image
 
     @cached_property
-    def screenshot_deque(self):
+    def screenshot_recorder(self):
         try:
             length = int(self.config.Error_ScreenshotLength)
         except ValueError:
             logger.error(f'Error_ScreenshotLength={self.config.Error_ScreenshotLength} is not an integer')
             raise RequestHumanTakeover
+        try:
+            budget = float(self.config.Error_ScreenshotMemory)
+        except ValueError:
+            logger.error(f'Error_ScreenshotMemory={self.config.Error_ScreenshotMemory} is not a number')
+            raise RequestHumanTakeover
         # Limit in 1~300
         length = max(1, min(length, 300))
-        return deque(maxlen=length)
+        # Limit in 16MB~1GB
+        budget = max(16, min(budget, 1024))
+        return ScreenshotRecorder(length=length, budget=budget)
 
     def save_screenshot(self, genre='items', interval=None, to_base_folder=False):
         """Save a screenshot. Use millisecond timestamp as file name.
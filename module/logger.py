@@ -1,7 +1,9 @@
 import datetime
 import logging
 import os
+import queue
 import sys
+import threading
 from typing import Callable, List
 
 from rich.console import Console, ConsoleOptions, ConsoleRenderable, NewLine
@@ -86,6 +88,102 @@ class RichRenderableHandler(RichHandler):
         super().handle(record)
 
 
+class AsyncHandler(logging.Handler):
+    """
+    Handle log records in a background thread.
+
+    Task thread only formats the message string and puts the record into a bounded queue,
+    rich rendering, file writes and IPC are done by the wrapped handlers in the background thread.
+    When queue is full, INFO and DEBUG logs are dropped and counted, unless `block` is set,
+    WARNING and above, and logs with exceptions, always wait for the queue.
+    """
+
+    def __init__(self, handlers, maxsize=10000, block=False):
+        """
+        Args:
+            handlers (list[logging.Handler]): Handlers to run in background.
+            maxsize (int): Max records in queue.
+            block (bool): True to wait when queue is full, False to drop.
+        """
+        super().__init__()
+        self.handlers = list(handlers)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.block = block
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._worker, name='AsyncLogger', daemon=True)
+        self._thread.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Format message now, args may be modified before the background thread gets it
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def put(self, item, important=False):
+        """
+        Args:
+            item (logging.LogRecord, tuple): Log record, or (objects, kwargs) from logger.print().
+            important (bool): True to wait for the queue even if not `block`.
+        """
+        if self.block or important:
+            self.queue.put(item)
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            important = record.levelno >= logging.WARNING or bool(record.exc_info)
+            self.put(self.prepare(record), important=important)
+        except Exception:
+            self.handleError(record)
+
+    def _handle(self, item):
+        if isinstance(item, logging.LogRecord):
+            for hdlr in self.handlers:
+                if item.levelno >= hdlr.level:
+                    hdlr.handle(item)
+        else:
+            objects, kwargs = item
+            for hdlr in self.handlers:
+                _print(hdlr, *objects, **kwargs)
+
+    def _worker(self):
+        while 1:
+            item = self.queue.get()
+            try:
+                self._handle(item)
+                if self.dropped:
+                    dropped, self.dropped = self.dropped, 0
+                    self._handle(logger.makeRecord(
+                        logger.name, logging.WARNING, __file__, 0,
+                        f'Log queue full, {dropped} logs dropped', None, None))
+            except Exception:
+                # Don't let a broken handler kill the thread
+                pass
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """
+        Wait until all queued logs are handled.
+        """
+        if threading.current_thread() is not self._thread and self._thread.is_alive():
+            self.queue.join()
+        for hdlr in self.handlers:
+            hdlr.flush()
+
+    def replace(self, hdlr, types):
+        """
+        Replace handlers of `types` with `hdlr`.
+        Queued logs are flushed first, so they go to the old handler.
+        """
+        self.flush()
+        self.handlers = [h for h in self.handlers if not isinstance(h, types)] + [hdlr]
+
+
 class HTMLConsole(Console):
     """
     Force full feature console
@@ -214,9 +312,7 @@ def set_file_logger(name=pyw_name):
     )
     hdlr.setFormatter(file_formatter)
 
-    logger.handlers = [h for h in logger.handlers if not isinstance(
-        h, (logging.FileHandler, RichFileHandler))]
-    logger.addHandler(hdlr)
+    _replace_handler(hdlr, (logging.FileHandler, RichFileHandler))
     logger.log_file = log_file
 
 
@@ -243,11 +339,43 @@ def set_func_logger(func):
         highlighter=Highlighter(),
     )
     hdlr.setFormatter(web_formatter)
-    logger.handlers = [h for h in logger.handlers if not isinstance(
-        h, RichRenderableHandler)]
+    _replace_handler(hdlr, RichRenderableHandler)
+
+
+def _replace_handler(hdlr, types):
+    """
+    Replace handlers of `types` with `hdlr`, inside AsyncHandler if async logging is on.
+    """
+    for h in logger.handlers:
+        if isinstance(h, AsyncHandler):
+            h.replace(hdlr, types)
+            return
+    logger.handlers = [h for h in logger.handlers if not isinstance(h, types)]
     logger.addHandler(hdlr)
 
 
+def set_async_logger(maxsize=10000, block=False):
+    """
+    Move current handlers into an AsyncHandler, so logging doesn't block the task thread.
+
+    Args:
+        maxsize (int): Max records in queue.
+        block (bool): True to wait when queue is full, False to drop INFO and DEBUG logs.
+    """
+    if any(isinstance(h, AsyncHandler) for h in logger.handlers):
+        return
+    logger.handlers = [AsyncHandler(logger.handlers, maxsize=maxsize, block=block)]
+
+
+def flush():
+    """
+    Wait until queued logs are handled, call this before process exits.
+    Processes started by multiprocessing exit without calling logging.shutdown().
+    """
+    for hdlr in logger.handlers:
+        hdlr.flush()
+
+
 def _get_renderables(
     self: Console, *objects, sep=" ", end="\n", justify=None, emoji=None, markup=None, highlight=None,
 ) -> List[ConsoleRenderable]:
@@ -273,13 +401,20 @@ def _get_renderables(
     return renderables
 
 
+def _print(hdlr, *objects, **kwargs):
+    if isinstance(hdlr, RichRenderableHandler):
+        for renderable in _get_renderables(hdlr.console, *objects, **kwargs):
+            hdlr._func(renderable)
+    elif isinstance(hdlr, RichHandler):
+        hdlr.console.print(*objects)
+
+
 def print(*objects: ConsoleRenderable, **kwargs):
     for hdlr in logger.handlers:
-        if isinstance(hdlr, RichRenderableHandler):
-            for renderable in _get_renderables(hdlr.console, *objects, **kwargs):
-                hdlr._func(renderable)
-        elif isinstance(hdlr, RichHandler):
-            hdlr.console.print(*objects)
+        if isinstance(hdlr, AsyncHandler):
+            hdlr.put((objects, kwargs))
+        else:
+            _print(hdlr, *objects, **kwargs)
 
 
 def rule(title="", *, characters="─", style="rule.line", end="\n", align="center"):
@@ -349,6 +484,8 @@ logger.attr = attr
 logger.attr_align = attr_align
 logger.set_file_logger = set_file_logger
 logger.set_func_logger = set_func_logger
+logger.set_async_logger = set_async_logger
+logger.flush = flush
 logger.rule = rule
 logger.print = print
 logger.log_file: str
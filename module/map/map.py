@@ -6,6 +6,7 @@ from module.exception import MapEnemyMoved
 from module.logger import logger
 from module.map.fleet import Fleet
 from module.map.map_grids import RoadGrids, SelectedGrids
+from module.map.route_planner import RoutePlanner
 from module.map_detection.grid_info import GridInfo
 
 ENEMY_FILTER = Filter(regex=re.compile('^(.*?)$'), attr=('str',))
@@ -204,6 +205,8 @@ class Map(Fleet):
         elif self.config.MAP_CLEAR_ALL_THIS_TIME:
             kwargs['strongest'] = True
         grids = self.select_grids(grids, **kwargs)
+        if grids and self.config.MAP_CLEAR_ROUTE_PLAN:
+            grids = self.plan_enemy_route(grids)
 
         if grids:
             logger.hr('Clear enemy')
@@ -213,6 +216,27 @@ class Map(Fleet):
 
         return False
 
+    def plan_enemy_route(self, grids):
+        """
+        Plan enemies to clear for the remaining battles before boss.
+
+        Args:
+            grids (SelectedGrids): Enemies to clear now, sorted by select_grids().
+
+        Returns:
+            SelectedGrids: Enemies with the planned one at front.
+        """
+        boss = [data['battle'] for data in self.map.spawn_data if 'boss' in data and 'battle' in data]
+        if not boss:
+            return grids
+        depth = min(boss[0] - self.battle_count, self.config.MAP_CLEAR_ROUTE_PLAN_DEPTH)
+        if depth <= 1 or len(grids) <= 1:
+            return grids
+
+        planner = RoutePlanner(self.map, has_ambush=self.config.MAP_HAS_AMBUSH)
+        targets = self.map.select(is_enemy=True, is_boss=False)
+        return planner.plan_grids(self.fleet_current, candidates=grids, targets=targets, depth=depth)
+
     def clear_roadblocks(self, roads, **kwargs):
         """Clear roadblocks.
 
@@ -485,6 +509,8 @@ class Map(Fleet):
             grids = grids.add(self.map.select(is_fortress=True))
 
         grids = self.select_grids(grids, **kwargs)
+        if grids and self.config.MAP_CLEAR_ROUTE_PLAN:
+            grids = self.plan_enemy_route(grids)
 
         if grids:
             logger.hr('Clear enemy')
@@ -1,8 +1,10 @@
 import copy
+import heapq
+from collections import OrderedDict
 
 from module.base.utils import location2node, node2location
 from module.logger import logger
-from module.map.map_grids import SelectedGrids
+from module.map.map_grids import GridColumns, GridIndex, SelectedGrids
 from module.map.utils import *
 from module.map_detection.grid_info import GridInfo
 
@@ -35,6 +37,15 @@ class CampaignMap:
         self.poor_map_data = False
         self.camera_sight = (-3, -1, 3, 2)
         self.grid_connection = {}
+        # Compiled grid_connection, see grid_connection_initial(). Key: (wall, portal)
+        self._grid_connection_compiled = {}
+        self._grid_connection_key = None
+        # Compiled grid_connection and distance fields, see find_path_initial(). Key: (wall, portal)
+        self._path_graph = {}
+        self._path_cache = OrderedDict()
+        self._grid_index = None
+        # Grid attributes in columns, created with grids
+        self.columns = None
 
     def __iter__(self):
         return iter(self.grids.values())
@@ -67,18 +78,20 @@ class CampaignMap:
     @shape.setter
     def shape(self, scale):
         self._shape = node2location(scale.upper())
+        self.clear_compiled()
+        self._grid_index = None
         for y in range(self._shape[1] + 1):
             for x in range(self._shape[0] + 1):
                 grid = self.grid_class()
                 grid.location = (x, y)
                 self.grids[(x, y)] = grid
+        self.columns = GridColumns(self.grids.values())
 
         # camera_data can be generate automatically, but it's better to set it manually.
         self.camera_data = [location2node(loca) for loca in camera_2d((0, 0, *self._shape), sight=self.camera_sight)]
         self.camera_data_spawn_point = []
         # weight_data set to 10.
-        for grid in self:
-            grid.weight = 10.
+        self.columns.fill('weight', 10.)
 
     @property
     def map_data(self):
@@ -125,6 +138,7 @@ class CampaignMap:
     @wall_data.setter
     def wall_data(self, text):
         self._wall_data = text
+        self.clear_compiled()
 
     @property
     def portal_data(self):
@@ -140,6 +154,7 @@ class CampaignMap:
             node1, node2 = location_ensure(nodes[0]), location_ensure(nodes[1])
             self._portal_data.append((node1, node2))
             self[node1].is_portal = True
+        self.clear_compiled()
 
     @property
     def land_based_data(self):
@@ -257,6 +272,38 @@ class CampaignMap:
         """
         logger.info(f'grid_connection: wall={wall}, portal={portal}')
 
+        # Grid connection is compiled once for each combination of wall and portal,
+        # since it's re-initialized on every map_init() and twice a round on maps with movable sirens.
+        key = (bool(wall and self._wall_data), bool(portal))
+        compiled = self._grid_connection_compiled.get(key)
+        if compiled is None:
+            compiled = self._grid_connection_compile(wall=key[0], portal=key[1])
+            self._grid_connection_compiled[key] = compiled
+        self.grid_connection = {location: set(connection) for location, connection in compiled.items()}
+        self._grid_connection_key = key
+
+        # Set portal grids
+        for start, end in self._portal_data:
+            if portal:
+                self[start].is_portal = True
+                self[start].portal_link = end
+            else:
+                self[start].is_portal = False
+                self[start].portal_link = None
+
+        return True
+
+    def _grid_connection_compile(self, wall=False, portal=False):
+        """
+        Args:
+            wall (bool): If use wall_data
+            portal (bool): If use portal_data
+
+        Returns:
+            dict: Key: location, value: frozenset of connected locations.
+        """
+        grid_connection = {}
+
         # Generate grid connection.
         total = set([grid for grid in self.grids.keys()])
         for grid in self:
@@ -265,7 +312,7 @@ class CampaignMap:
                 arr = tuple(arr + grid.location)
                 if arr in total:
                     connection.add(arr)
-            self.grid_connection[grid.location] = connection
+            grid_connection[grid.location] = connection
 
         # Use wall_data to delete connection.
         if wall and self._wall_data:
@@ -285,22 +332,28 @@ class CampaignMap:
             for g1, g2 in disconnect:
                 g1 = tuple(g1.tolist())
                 g2 = tuple(g2.tolist())
-                self.grid_connection[g1].remove(g2)
-                self.grid_connection[g2].remove(g1)
+                grid_connection[g1].remove(g2)
+                grid_connection[g2].remove(g1)
 
         # Create portal link
         for start, end in self._portal_data:
             if portal:
-                self.grid_connection[start].add(end)
-                self[start].is_portal = True
-                self[start].portal_link = end
+                grid_connection[start].add(end)
             else:
-                if end in self.grid_connection[start]:
-                    self.grid_connection[start].remove(end)
-                self[start].is_portal = False
-                self[start].portal_link = None
+                if end in grid_connection[start]:
+                    grid_connection[start].remove(end)
 
-        return True
+        return {location: frozenset(connection) for location, connection in grid_connection.items()}
+
+    def clear_compiled(self):
+        """
+        Clear compiled grid_connection and path finding data,
+        should be called if grids, walls or portals changed.
+        """
+        self._grid_connection_compiled.clear()
+        self._grid_connection_key = None
+        self._path_graph.clear()
+        self._path_cache.clear()
 
     def fixup_submarine_fleet(self):
         # fixup submarine spawn point
@@ -363,8 +416,11 @@ class CampaignMap:
             return False
 
     def reset(self):
-        for grid in self:
-            grid.reset()
+        if self.columns is not None and self.columns.can_reset():
+            self.columns.reset()
+        else:
+            for grid in self:
+                grid.reset()
 
     def reset_fleet(self):
         for grid in self:
@@ -531,44 +587,131 @@ class CampaignMap:
                  range(self.shape[0] + 1)])
             logger.info(text)
 
-    def find_path_initial(self, location, has_ambush=True, has_enemy=True):
+    @property
+    def path_graph(self):
         """
+        grid_connection compiled into indexes, compiled once for each grid_connection_initial() arguments.
+
+        Returns:
+            tuple[list, list]: (locations, neighbours)
+                locations (list[tuple]): Grid locations, index of grids in the graph.
+                neighbours (list[list[tuple[int, bool]]]): Index of connected grids, and if connected horizontally.
+        """
+        graph = self._path_graph.get(self._grid_connection_key)
+        if graph is None:
+            locations = list(self.grids.keys())
+            index = {location: i for i, location in enumerate(locations)}
+            neighbours = []
+            for location in locations:
+                connection = self.grid_connection.get(location, set())
+                # Sort to have the same result in every run
+                neighbours.append([(index[arr], abs(arr[0] - location[0]) == 1)
+                                   for arr in sorted(connection) if arr in index])
+            graph = (locations, neighbours)
+            if self._grid_connection_key is not None:
+                self._path_graph[self._grid_connection_key] = graph
+        return graph
+
+    def path_field(self, location, has_ambush=True, has_enemy=True, cleared=()):
+        """
+        Calculate the distance field from the given location, using Dijkstra.
+        Entering a grid costs 10 if it may have ambush, otherwise 1.
+        Land and mechanism blocks can't be entered, non-sea grids can be entered but not passed through.
+        If several routes have the same cost, the one entering the grid horizontally is preferred.
+        Costs are always the shortest, the set-based relaxation before may stop before converging,
+        and `connection` may differ from it when predecessors have the same cost.
+
+        Distance fields are cached by the start location and grid states that affect pathfinding,
+        so calling it again without any map changes only costs a state check.
+
         Args:
             location (tuple(int)): Grid location
             has_ambush (bool): MAP_HAS_AMBUSH
             has_enemy (bool): False if only sea and land are considered
+            cleared (list[tuple]): Locations to be treated as sea, to plan routes after clearing enemies on them.
+
+        Returns:
+            tuple[list, list, list]: (locations, cost, connection)
+                locations (list[tuple]): Grid locations, see path_graph.
+                cost (list[int]): Cost to each grid, 9999 if unreachable.
+                connection (list[int]): Index of the previous grid on route, -1 if no previous grid.
         """
         location = location_ensure(location)
         ambush_cost = 10 if has_ambush else 1
-        for grid in self:
-            grid.cost = 9999
-            grid.connection = None
-        start = self[location]
-        start.cost = 0
-        visited = [start]
-        visited = set(visited)
-
-        while 1:
-            new = visited.copy()
-            for grid in visited:
-                for arr in self.grid_connection[grid.location]:
-                    arr = self[arr]
-                    if arr.is_land or arr.is_mechanism_block:
+        locations, neighbours = self.path_graph
+        grids = [self.grids[loca] for loca in locations]
+        columns = self.columns
+        if columns is not None and len(columns.grids) == len(locations) and columns.cls.is_sea is GridInfo.is_sea:
+            # Columns and path graph are both in the order of self.grids
+            blocked = columns.any('is_land', 'is_mechanism_block')
+            ambush = columns.any('may_ambush')
+            sea = ~columns.any('is_land', 'is_enemy', 'is_siren', 'is_fortress', 'is_boss')
+        else:
+            blocked = np.array([grid.is_land or grid.is_mechanism_block for grid in grids], dtype=bool)
+            ambush = np.array([grid.may_ambush for grid in grids], dtype=bool)
+            sea = np.array([grid.is_sea for grid in grids], dtype=bool)
+        if has_enemy:
+            passable = sea
+            for loca in cleared:
+                passable[locations.index(loca)] = True
+        else:
+            passable = np.ones(len(grids), dtype=bool)
+
+        key = (location, ambush_cost, self._grid_connection_key,
+               np.packbits(np.concatenate([blocked, ambush, passable])).tobytes())
+        result = self._path_cache.get(key)
+        if result is None:
+            weight = np.where(ambush, ambush_cost, 1).tolist()
+            blocked, passable = blocked.tolist(), passable.tolist()
+            cost = [9999] * len(grids)
+            connection = [-1] * len(grids)
+            start = locations.index(location)
+            cost[start] = 0
+            queue = [(0, start)]
+            while queue:
+                current, index = heapq.heappop(queue)
+                if current > cost[index]:
+                    continue
+                for arr, horizontal in neighbours[index]:
+                    if blocked[arr]:
                         continue
-                    cost = ambush_cost if arr.may_ambush else 1
-                    cost += grid.cost
-
-                    if cost < arr.cost:
-                        arr.cost = cost
-                        arr.connection = grid.location
-                    elif cost == arr.cost:
-                        if abs(arr.location[0] - grid.location[0]) == 1:
-                            arr.connection = grid.location
-                    if arr.is_sea or not has_enemy:
-                        new.add(arr)
-            if len(new) == len(visited):
-                break
-            visited = new
+                    new = current + weight[arr]
+                    if new < cost[arr]:
+                        cost[arr] = new
+                        connection[arr] = index
+                        if passable[arr]:
+                            heapq.heappush(queue, (new, arr))
+                    elif new == cost[arr] and horizontal:
+                        connection[arr] = index
+            result = (cost, connection)
+            self._path_cache[key] = result
+            if len(self._path_cache) > 256:
+                self._path_cache.popitem(last=False)
+        else:
+            self._path_cache.move_to_end(key)
+
+        return (locations, *result)
+
+    def find_path_initial(self, location, has_ambush=True, has_enemy=True):
+        """
+        Set `cost` and `connection` of all grids, see path_field().
+
+        Args:
+            location (tuple(int)): Grid location
+            has_ambush (bool): MAP_HAS_AMBUSH
+            has_enemy (bool): False if only sea and land are considered
+        """
+        locations, cost, connection = self.path_field(location, has_ambush=has_ambush, has_enemy=has_enemy)
+        connection = [locations[index] if index >= 0 else None for index in connection]
+        if self.columns is not None and len(self.columns.grids) == len(locations):
+            # Columns and path graph are both in the order of self.grids
+            self.columns.assign('cost', cost)
+            self.columns.assign('connection', connection)
+        else:
+            for loca, grid_cost, grid_connection in zip(locations, cost, connection):
+                grid = self.grids[loca]
+                grid.cost = grid_cost
+                grid.connection = grid_connection
 
         # self.show_cost()
         # self.show_connection()
@@ -586,8 +729,11 @@ class CampaignMap:
                 continue
             self.find_path_initial(location, has_ambush=has_ambush)
             attr = f'cost_{fleet}'
-            for grid in self:
-                grid.__setattr__(attr, grid.cost)
+            if self.columns is not None and 'cost' in self.columns:
+                self.columns.assign(attr, self.columns.data['cost'])
+            else:
+                for grid in self:
+                    grid.__setattr__(attr, grid.cost)
 
     def _find_path(self, location):
         """
@@ -795,6 +941,16 @@ class CampaignMap:
                     logger.info('Predict %s to be enemy' % location2node(upper.location))
                     upper.__setattr__('is_enemy', True)
 
+    @property
+    def grid_index(self):
+        """
+        Returns:
+            GridIndex:
+        """
+        if self._grid_index is None:
+            self._grid_index = GridIndex(self.grids.values(), columns=self.columns)
+        return self._grid_index
+
     def select(self, **kwargs):
         """
         Args:
@@ -803,16 +959,7 @@ class CampaignMap:
         Returns:
             SelectedGrids:
         """
-        result = []
-        for grid in self:
-            flag = True
-            for k, v in kwargs.items():
-                if grid.__getattribute__(k) != v:
-                    flag = False
-            if flag:
-                result.append(grid)
-
-        return SelectedGrids(result)
+        return SelectedGrids(self.grid_index.select(**kwargs))
 
     def to_selected(self, grids):
         """
@@ -1,6 +1,10 @@
 import operator
 import typing as t
 
+import numpy as np
+
+from module.map_detection.grid_info import Column, GridInfo, indexed_class
+
 
 class SelectedGrids:
     def __init__(self, grids):
@@ -303,6 +307,260 @@ class SelectedGrids:
         return SelectedGrids(grids)
 
 
+class GridColumns:
+    def __init__(self, grids):
+        """
+        Store grid attributes in columns, one numpy array for each attribute in GridInfo.COLUMNS.
+
+        Grids get and set these attributes through Column, so the per-grid API is unchanged,
+        while map-wide operations, like resetting grids or assigning path costs, are done on
+        whole columns instead of grid by grid.
+        Columns are object arrays, values are the same python objects as they were in grids.
+
+        Args:
+            grids (list[GridInfo]): Grids of a map, must be in the same class.
+        """
+        self.grids = list(grids)
+        self.cls = type(self.grids[0]) if self.grids else GridInfo
+        # GridIndex of the same grids, bitsets are dropped when columns are assigned
+        self.index = None
+        # Key: attribute name. Value: np.ndarray, dtype object, shape (n,)
+        self.data = {}
+        for name in self.cls.COLUMNS:
+            if not isinstance(self._resolve(name), Column):
+                # Overridden by a property or something in subclass
+                continue
+            column = np.empty(len(self.grids), dtype=object)
+            for index, grid in enumerate(self.grids):
+                column[index] = grid.__getattribute__(name)
+            self.data[name] = column
+
+        for index, grid in enumerate(self.grids):
+            for name in self.data:
+                grid.__dict__.pop(name, None)
+            grid._columns = self
+            grid._column_index = index
+
+    def __contains__(self, item):
+        return item in self.data
+
+    def _resolve(self, name):
+        for cls in self.cls.__mro__:
+            if name in cls.__dict__:
+                return cls.__dict__[name]
+        return None
+
+    def fill(self, name, value):
+        """
+        Set attribute of all grids to the same value.
+
+        Args:
+            name (str):
+            value:
+        """
+        if name not in self.data:
+            for grid in self.grids:
+                grid.__setattr__(name, value)
+            return
+        if self.index is not None:
+            self.index.drop(name)
+        if isinstance(value, (bool, int, float, str, type(None))):
+            self.data[name][:] = value
+        else:
+            # Don't let numpy broadcast tuples or lists
+            column = self.data[name]
+            for index in range(len(column)):
+                column[index] = value
+
+    def assign(self, name, values):
+        """
+        Set attribute of each grid.
+
+        Args:
+            name (str):
+            values (list, np.ndarray): Values in the order of grids.
+        """
+        if name not in self.data:
+            for grid, value in zip(self.grids, values):
+                grid.__setattr__(name, value)
+            return
+        if self.index is not None:
+            self.index.drop(name)
+        if isinstance(values, np.ndarray) and values.dtype != object:
+            self.data[name][:] = values.tolist()
+        else:
+            # Don't let numpy broadcast tuples in list
+            column = self.data[name]
+            for index, value in enumerate(values):
+                column[index] = value
+
+    def any(self, *names):
+        """
+        Args:
+            *names (str): Attribute names.
+
+        Returns:
+            np.ndarray: Shape (n,), dtype bool, if any of the attributes is true on each grid.
+        """
+        result = np.zeros(len(self.grids), dtype=bool)
+        for name in names:
+            if name in self.data:
+                result |= self.data[name].astype(bool)
+            else:
+                result |= np.array([bool(grid.__getattribute__(name)) for grid in self.grids], dtype=bool)
+        return result
+
+    def can_reset(self):
+        """
+        Returns:
+            bool: If reset() can be done on columns, grids don't have their own reset().
+        """
+        return self.cls.reset is GridInfo.reset and self.cls.wipe_out is GridInfo.wipe_out
+
+    def reset(self):
+        """
+        Same as calling GridInfo.reset() on all grids.
+        """
+        # Side effect of wipe_out(), mechanism triggered by previous grids are reset by them already
+        if 'is_mechanism_trigger' in self.data:
+            for index in np.flatnonzero(self.data['is_mechanism_trigger'] == True):
+                grid = self.grids[index]
+                if grid.is_mechanism_trigger:
+                    grid.mechanism_trigger.set(is_mechanism_trigger=False)
+                    grid.mechanism_block.set(is_mechanism_block=False)
+        for name, value in self.cls.WIPE_OUT.items():
+            self.fill(name, value)
+        for name, value in self.cls.RESET.items():
+            self.fill(name, value)
+
+
+class GridIndex:
+    def __init__(self, grids, columns=None):
+        """
+        Index grid attributes in bitsets, for CampaignMap.select().
+
+        Each indexed attribute has a dict of value to bitset, bit i is set if grids[i] has that value.
+        Selecting is AND of bitsets, instead of getting attributes of all grids.
+        Attributes are indexed on the first select, and kept updated by IndexedGrid.__setattr__(),
+        grids are switched to their indexed class here.
+        Properties and unhashable values can't be indexed, they are selected by getting attributes.
+        Attributes in GridColumns are indexed from columns, and the index is dropped when
+        columns are assigned as a whole, since that doesn't go through IndexedGrid.__setattr__().
+
+        Args:
+            grids (list[GridInfo]):
+            columns (GridColumns): Columns of the same grids.
+        """
+        self.grids = list(grids)
+        self.columns = columns
+        if columns is not None:
+            columns.index = self
+        self.position = {id(grid): index for index, grid in enumerate(self.grids)}
+        self.full = (1 << len(self.grids)) - 1
+        # Key: attribute name. Value: dict, key: attribute value, value: bitset
+        self.bitsets = {}
+        self.unindexed = set()
+        for grid in self.grids:
+            grid._grid_index = self
+            grid.__class__ = indexed_class(grid.__class__)
+
+    def index(self, attr):
+        """
+        Args:
+            attr (str): Attribute name.
+
+        Returns:
+            bool: If attribute is indexed.
+        """
+        if attr in self.bitsets:
+            return True
+        if attr in self.unindexed or not self.grids:
+            return False
+        if hasattr(getattr(type(self.grids[0]), attr, None), '__get__'):
+            # Properties or methods
+            self.unindexed.add(attr)
+            return False
+
+        if self.columns is not None and attr in self.columns:
+            values = self.columns.data[attr].tolist()
+        else:
+            values = [grid.__getattribute__(attr) for grid in self.grids]
+        bitsets = {}
+        try:
+            for index, value in enumerate(values):
+                bitsets[value] = bitsets.get(value, 0) | (1 << index)
+        except TypeError:
+            # Unhashable
+            self.unindexed.add(attr)
+            return False
+        self.bitsets[attr] = bitsets
+        return True
+
+    def drop(self, attr):
+        """
+        Drop the index of an attribute, it will be indexed again on the next select.
+
+        Args:
+            attr (str):
+        """
+        self.bitsets.pop(attr, None)
+
+    def update(self, grid, attr, value):
+        """
+        Called before setting attribute to grid.
+
+        Args:
+            grid (GridInfo):
+            attr (str):
+            value:
+        """
+        index = self.position.get(id(grid))
+        if index is None or self.grids[index] is not grid:
+            # Grid copied from an indexed grid
+            return
+        bitsets = self.bitsets[attr]
+        bit = 1 << index
+        old = grid.__getattribute__(attr)
+        try:
+            bitsets[old] &= ~bit
+            if not bitsets[old]:
+                del bitsets[old]
+            bitsets[value] = bitsets.get(value, 0) | bit
+        except (TypeError, KeyError):
+            # Unhashable, drop the index
+            del self.bitsets[attr]
+            self.unindexed.add(attr)
+
+    def select(self, **kwargs):
+        """
+        Args:
+            **kwargs: Attributes of Grid.
+
+        Returns:
+            list[GridInfo]: Grids with attributes equal to the given values, in the original order.
+        """
+        bitset = self.full
+        others = {}
+        for attr, value in kwargs.items():
+            try:
+                if self.index(attr):
+                    bitset &= self.bitsets[attr].get(value, 0)
+                    continue
+            except TypeError:
+                pass
+            others[attr] = value
+
+        result = []
+        while bitset:
+            low = bitset & -bitset
+            result.append(self.grids[low.bit_length() - 1])
+            bitset ^= low
+        if others:
+            result = [grid for grid in result
+                      if all([grid.__getattribute__(k) == v for k, v in others.items()])]
+        return result
+
+
 class RoadGrids:
     def __init__(self, grids):
         """
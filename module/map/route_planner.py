@@ -0,0 +1,77 @@
+from module.base.utils import location2node
+from module.logger import logger
+from module.map.map_base import CampaignMap
+from module.map.map_grids import SelectedGrids
+from module.map.utils import location_ensure
+
+
+class RoutePlanner:
+    def __init__(self, campaign_map, has_ambush=True, beam=8):
+        """
+        Plan the order of enemies to clear for the remaining battles, instead of picking the best one greedily.
+
+        Route cost is the sum of path costs to each enemy, with ambush exposure included as in
+        CampaignMap.path_field(), plus the weight of each enemy grid from weight_data.
+        After an enemy is cleared, its grid is treated as sea, so enemies blocked behind it can be planned.
+        Routes are searched by beam search, keeping the `beam` cheapest partial routes in each step.
+        Distance fields are cached in CampaignMap, states shared between routes are calculated once.
+
+        Args:
+            campaign_map (CampaignMap):
+            has_ambush (bool): MAP_HAS_AMBUSH
+            beam (int): Beam width.
+        """
+        self.map = campaign_map
+        self.has_ambush = has_ambush
+        self.beam = beam
+
+    def plan(self, start, candidates, targets, depth):
+        """
+        Args:
+            start (tuple): Location of current fleet.
+            candidates (SelectedGrids): Enemies allowed to be the first one, in the order of preference.
+            targets (SelectedGrids): Enemies allowed to be cleared afterwards.
+            depth (int): Number of battles to plan.
+
+        Returns:
+            list[tuple]: Locations of enemies in planned order, empty if no enemy reachable.
+        """
+        start = location_ensure(start)
+        # (total cost, route)
+        beam = [(0, ())]
+        for step in range(max(depth, 1)):
+            options = candidates if step == 0 else targets
+            expanded = []
+            for total, route in beam:
+                location = route[-1] if route else start
+                locations, cost, _ = self.map.path_field(location, has_ambush=self.has_ambush, cleared=route)
+                index = {loca: i for i, loca in enumerate(locations)}
+                for grid in options:
+                    if grid.location in route or grid.location not in index:
+                        continue
+                    grid_cost = cost[index[grid.location]]
+                    if grid_cost >= 9999:
+                        continue
+                    expanded.append((total + grid_cost + grid.weight, route + (grid.location,)))
+            if not expanded:
+                break
+            # Sort is stable, routes with the same cost are kept in the order of candidates
+            expanded.sort(key=lambda x: x[0])
+            beam = expanded[:self.beam]
+
+        total, route = beam[0]
+        return list(route)
+
+    def plan_grids(self, start, candidates, targets, depth):
+        """
+        Same as plan(), but returns candidates with the planned first enemy moved to the front.
+
+        Returns:
+            SelectedGrids:
+        """
+        route = self.plan(start, candidates=candidates, targets=targets, depth=depth)
+        if not route:
+            return candidates
+        logger.info(f'Route plan: {" -> ".join([location2node(loca) for loca in route])}')
+        first = self.map[route[0]]
+        return SelectedGrids([first] + [grid for grid in candidates if grid is not first])
@@ -1,6 +1,47 @@
 from module.base.utils import location2node
 
 
+class Column:
+    def __init__(self, name, default):
+        """
+        Attribute of GridInfo, stored in the GridColumns of the map that grid belongs to,
+        or in the grid itself if grid doesn't belong to a map.
+
+        Args:
+            name (str): Attribute name.
+            default: Default value.
+        """
+        self.name = name
+        self.default = default
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self.default
+        columns = obj._columns
+        if columns is None:
+            return obj.__dict__.get(self.name, self.default)
+        return columns.data[self.name][obj._column_index]
+
+    def __set__(self, obj, value):
+        columns = obj._columns
+        if columns is None:
+            obj.__dict__[self.name] = value
+        else:
+            columns.data[self.name][obj._column_index] = value
+
+
+def grid_columns(cls):
+    """
+    Class decorator that turns attributes in `cls.COLUMNS` declared in this class into Column.
+    """
+    for name in cls.COLUMNS:
+        value = cls.__dict__.get(name, None)
+        if name in cls.__dict__ and not isinstance(value, Column):
+            setattr(cls, name, Column(name, value))
+    return cls
+
+
+@grid_columns
 class GridInfo:
     """
     Class that gather basic information of a grid in map_v1.
@@ -73,6 +114,49 @@ class GridInfo:
     weight = 1
 
     location = None
+    # GridIndex of the CampaignMap that this grid belongs to
+    _grid_index = None
+    # GridColumns of the CampaignMap that this grid belongs to, and index of this grid in it
+    _columns = None
+    _column_index = 0
+
+    # Attributes stored in GridColumns
+    COLUMNS = (
+        'is_land', 'is_spawn_point', 'is_submarine_spawn_point',
+        'may_enemy', 'may_boss', 'may_mystery', 'may_ammo', 'may_siren', 'may_ambush',
+        'is_enemy', 'is_boss', 'is_mystery', 'is_ammo', 'is_fleet', 'is_current_fleet', 'is_submarine', 'is_siren',
+        'is_portal', 'enemy_scale', 'enemy_genre',
+        'is_cleared', 'is_caught_by_siren', 'is_carrier', 'is_movable',
+        'is_mechanism_trigger', 'is_mechanism_block', 'mechanism_trigger', 'mechanism_block',
+        'is_fortress', 'is_flare', 'is_missile_attack', 'may_bouncing_enemy',
+        'cost', 'cost_1', 'cost_2', 'connection', 'weight',
+    )
+    # Attributes set in wipe_out()
+    WIPE_OUT = {
+        'is_enemy': False,
+        'enemy_scale': 0,
+        'enemy_genre': None,
+        'is_mystery': False,
+        'is_boss': False,
+        'is_ammo': False,
+        'is_siren': False,
+        'is_fortress': False,
+        'is_caught_by_siren': False,
+        'is_carrier': False,
+        'is_movable': False,
+    }
+    # Attributes set in reset(), after wipe_out()
+    RESET = {
+        'is_fleet': False,
+        'is_current_fleet': False,
+        'is_submarine': False,
+        'is_cleared': False,
+        'is_mechanism_trigger': False,
+        'is_mechanism_block': False,
+        'mechanism_trigger': None,
+        'mechanism_block': None,
+        'may_bouncing_enemy': False,
+    }
 
     def decode(self, text):
         text = text.upper()
@@ -151,6 +235,22 @@ class GridInfo:
     def __hash__(self):
         return hash(self.location)
 
+    def __copy__(self):
+        """
+        Copy a grid, detached from the map.
+        """
+        cls = self.__class__
+        if issubclass(cls, IndexedGrid):
+            cls = cls.plain_class
+        grid = cls.__new__(cls)
+        grid.__dict__.update(self.__dict__)
+        if self._columns is not None:
+            for name in self._columns.data:
+                grid.__dict__[name] = self.__getattribute__(name)
+        for name in ['_columns', '_column_index', '_grid_index']:
+            grid.__dict__.pop(name, None)
+        return grid
+
     def __eq__(self, other):
         return self.location == other.location
 
@@ -296,17 +396,8 @@ class GridInfo:
         """
         Call this method when a fleet step on grid.
         """
-        self.is_enemy = False
-        self.enemy_scale = 0
-        self.enemy_genre = None
-        self.is_mystery = False
-        self.is_boss = False
-        self.is_ammo = False
-        self.is_siren = False
-        self.is_fortress = False
-        self.is_caught_by_siren = False
-        self.is_carrier = False
-        self.is_movable = False
+        for key, value in self.WIPE_OUT.items():
+            self.__setattr__(key, value)
         if self.is_mechanism_trigger:
             self.mechanism_trigger.set(is_mechanism_trigger=False)
             self.mechanism_block.set(is_mechanism_block=False)
@@ -316,15 +407,8 @@ class GridInfo:
         Call this method after entering a map.
         """
         self.wipe_out()
-        self.is_fleet = False
-        self.is_current_fleet = False
-        self.is_submarine = False
-        self.is_cleared = False
-        self.is_mechanism_trigger = False
-        self.is_mechanism_block = False
-        self.mechanism_trigger = None
-        self.mechanism_block = None
-        self.may_bouncing_enemy = False
+        for key, value in self.RESET.items():
+            self.__setattr__(key, value)
 
     def covered_grid(self):
         """Relative coordinate of the covered grid.
@@ -350,3 +434,38 @@ class GridInfo:
         l1 = self.location
         l2 = other.location
         return abs(l1[0] - l2[0]) + abs(l1[1] - l2[1])
+
+
+class IndexedGrid:
+    """
+    Mixin of grids indexed by GridIndex, keeps the index updated on attribute writes.
+    Grids that don't belong to a map, such as grids in View, don't have this hook,
+    so writing their attributes costs nothing extra.
+    """
+    plain_class = GridInfo
+
+    def __setattr__(self, key, value):
+        index = self._grid_index
+        if key in index.bitsets:
+            index.update(self, key, value)
+        object.__setattr__(self, key, value)
+
+
+_indexed_classes = {}
+
+
+def indexed_class(cls):
+    """
+    Args:
+        cls: Subclass of GridInfo.
+
+    Returns:
+        Subclass of `cls` and IndexedGrid, created once for each class.
+    """
+    if issubclass(cls, IndexedGrid):
+        return cls
+    indexed = _indexed_classes.get(cls)
+    if indexed is None:
+        indexed = type(cls.__name__, (IndexedGrid, cls), {'plain_class': cls, '__module__': cls.__module__})
+        _indexed_classes[cls] = indexed
+    return indexed
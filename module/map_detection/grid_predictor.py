@@ -8,6 +8,10 @@ from module.template.assets import *
 
 
 class GridPredictor:
+    # GridBatch shared by grids in the same view, set during View.predict()
+    batch = None
+    batch_index = 0
+
     def __init__(self, location, image, corner, config):
         """
         Args:
@@ -138,6 +142,8 @@ class GridPredictor:
         Returns:
             int: Number of matched pixels.
         """
+        if self.batch is not None:
+            return self.batch.rgb_count(area, color, shape, threshold)[self.batch_index]
         mask = color_similarity_2d(self.relative_crop(area, shape=shape), color=color)
         cv2.inRange(mask, threshold, 255, dst=mask)
         count = cv2.countNonZero(mask)
@@ -155,6 +161,8 @@ class GridPredictor:
         Returns:
             int: Number of matched pixels.
         """
+        if self.batch is not None:
+            return self.batch.hsv_count(area, h, s, v, shape)[self.batch_index]
         image = self.relative_crop(area, shape=shape)
         cv2.cvtColor(image, cv2.COLOR_RGB2HSV, dst=image)
         lower = (h[0] / 2, s[0] * 2.55, v[0] * 2.55)
@@ -164,6 +172,29 @@ class GridPredictor:
         count = cv2.countNonZero(image)
         return count
 
+    def relative_match(self, template, area, shape, color=None, similarity=0.85):
+        """
+        Crop image, convert it, and do template matching.
+
+        Args:
+            template (Template):
+            area (tuple): upper_left_x, upper_left_y, bottom_right_x, bottom_right_y, such as (-1, -1, 1, 1).
+            shape (tuple): Output image shape, (width, height).
+            color (tuple): Target RGB to calculate color_similarity_2d(), or None to use rgb2gray().
+            similarity (float): 0 to 1.
+
+        Returns:
+            bool: If matches.
+        """
+        if self.batch is not None:
+            return self.batch.similarity(template, area, shape, color=color)[self.batch_index] > similarity
+        image = self.relative_crop(area, shape=shape)
+        if color is None:
+            image = rgb2gray(image)
+        else:
+            image = color_similarity_2d(image, color=color)
+        return template.match(image, similarity=similarity)
+
     def predict_enemy_scale(self):
         """
         Detect the icon on the upper-left which shows enemy scale: Large, Middle, Small.
@@ -171,15 +202,15 @@ class GridPredictor:
         Returns:
             int: 1: Small, 2: Middle, 3: Large, 0: Unknown.
         """
-        image = self.relative_crop((-0.415 - 0.7, -0.62 - 0.7, -0.415, -0.62), shape=(50, 50))
-        red = color_similarity_2d(image, (255, 130, 132))
-        yellow = color_similarity_2d(image, (255, 235, 156))
+        area = (-0.415 - 0.7, -0.62 - 0.7, -0.415, -0.62)
+        red = (255, 130, 132)
+        yellow = (255, 235, 156)
 
-        if TEMPLATE_ENEMY_L.match(red, similarity=0.75):
+        if self.relative_match(TEMPLATE_ENEMY_L, area, shape=(50, 50), color=red, similarity=0.75):
             scale = 3
-        elif TEMPLATE_ENEMY_M.match(yellow):
+        elif self.relative_match(TEMPLATE_ENEMY_M, area, shape=(50, 50), color=yellow):
             scale = 2
-        elif TEMPLATE_ENEMY_S.match(yellow):
+        elif self.relative_match(TEMPLATE_ENEMY_S, area, shape=(50, 50), color=yellow):
             scale = 1
         else:
             scale = 0
@@ -190,19 +221,17 @@ class GridPredictor:
         if self.config.MAP_SIREN_HAS_BOSS_ICON:
             if self.enemy_scale:
                 return ''
-            image = self.relative_crop((-0.55, -0.2, 0.45, 0.2), shape=(50, 20))
-            image = color_similarity_2d(image, color=(255, 150, 24))
-            if image[image > 221].shape[0] > 200:
-                if TEMPLATE_ENEMY_BOSS.match(image, similarity=0.6):
+            area, color = (-0.55, -0.2, 0.45, 0.2), (255, 150, 24)
+            # Pixels > 221
+            if self.relative_rgb_count(area, color=color, shape=(50, 20), threshold=222) > 200:
+                if self.relative_match(TEMPLATE_ENEMY_BOSS, area, shape=(50, 20), color=color, similarity=0.6):
                     return 'Siren_Siren'
         if self.config.MAP_SIREN_HAS_BOSS_ICON_SMALL:
             if self.relative_hsv_count(area=(0.03, -0.15, 0.63, 0.15), h=(32 - 3, 32 + 3), shape=(50, 20)) > 100:
-                image = self.relative_crop((0.03, -0.15, 0.63, 0.15), shape=(50, 20))
-                image = color_similarity_2d(image, color=(255, 150, 33))
-                if TEMPLATE_ENEMY_BOSS.match(image, similarity=0.7):
+                if self.relative_match(TEMPLATE_ENEMY_BOSS, (0.03, -0.15, 0.63, 0.15), shape=(50, 20),
+                                       color=(255, 150, 33), similarity=0.7):
                     return 'Siren_Siren'
 
-        image_dic = {}
         scaling_dic = self.config.MAP_ENEMY_GENRE_DETECTION_SCALING
         for name, template in self.template_enemy_genre.items():
             if template is None:
@@ -215,11 +244,9 @@ class GridPredictor:
             scaling = scaling_dic.get(short_name, 1)
             scaling = (scaling,) if not isinstance(scaling, tuple) else scaling
             for scale in scaling:
-                if scale not in image_dic:
-                    shape = tuple(np.round(np.array((60, 60)) * scale).astype(int))
-                    image_dic[scale] = rgb2gray(self.relative_crop((-0.5, -1, 0.5, 0), shape=shape))
-
-                if template.match(image_dic[scale], similarity=self.config.MAP_ENEMY_GENRE_SIMILARITY):
+                shape = tuple(np.round(np.array((60, 60)) * scale).astype(int).tolist())
+                if self.relative_match(template, (-0.5, -1, 0.5, 0), shape=shape,
+                                       similarity=self.config.MAP_ENEMY_GENRE_SIMILARITY):
                     return name
 
         return None
@@ -228,16 +255,14 @@ class GridPredictor:
         if self.enemy_genre == 'Siren_Siren':
             return False
 
-        image = self.relative_crop((-0.55, -0.2, 0.45, 0.2), shape=(50, 20))
-        image = color_similarity_2d(image, color=(255, 77, 82))
-        if TEMPLATE_ENEMY_BOSS.match(image, similarity=0.75):
+        if self.relative_match(TEMPLATE_ENEMY_BOSS, (-0.55, -0.2, 0.45, 0.2), shape=(50, 20),
+                               color=(255, 77, 82), similarity=0.75):
             return True
 
         # Small boss icon
         if self.relative_hsv_count(area=(0.03, -0.15, 0.63, 0.15), h=(358 - 3, 358 + 3), shape=(50, 20)) > 100:
-            image = self.relative_crop((0.03, -0.15, 0.63, 0.15), shape=(50, 20))
-            image = color_similarity_2d(image, color=(255, 77, 82))
-            if TEMPLATE_ENEMY_BOSS.match(image, similarity=0.7):
+            if self.relative_match(TEMPLATE_ENEMY_BOSS, (0.03, -0.15, 0.63, 0.15), shape=(50, 20),
+                                   color=(255, 77, 82), similarity=0.7):
                 return True
 
         return False
@@ -246,14 +271,11 @@ class GridPredictor:
         return self.relative_rgb_count(area=(-0.5, -1, 0.5, 0), color=(255, 255, 60), shape=(50, 50)) > 35
 
     def predict_fleet(self):
-        image = self.relative_crop((-1, -2, -0.5, -1.5), shape=(50, 50))
-        image = color_similarity_2d(image, color=(255, 255, 255))
-        return TEMPLATE_FLEET_AMMO.match(image)
+        return self.relative_match(TEMPLATE_FLEET_AMMO, (-1, -2, -0.5, -1.5), shape=(50, 50), color=(255, 255, 255))
 
     def predict_submarine(self):
-        image = self.relative_crop((-0.86, 0.08, -0.36, 0.58), shape=(50, 50))
-        image = color_similarity_2d(image, color=(255, 243, 156))
-        return TEMPLATE_SUBMARINE.match(image)
+        return self.relative_match(TEMPLATE_SUBMARINE, (-0.86, 0.08, -0.36, 0.58), shape=(50, 50),
+                                   color=(255, 243, 156))
 
     def predict_caught_by_siren(self):
         image = self.relative_crop((-1, -1.5, 1, 0.5), shape=(120, 120))
@@ -280,9 +302,8 @@ class GridPredictor:
         if count < 600:
             return False
 
-        image = self.relative_crop((-0.5, -3.5, 0.5, -2.5), shape=(60, 60))
-        image = color_similarity_2d(image, color=(24, 255, 107))
-        if not TEMPLATE_FLEET_CURRENT.match(image):
+        if not self.relative_match(TEMPLATE_FLEET_CURRENT, (-0.5, -3.5, 0.5, -2.5), shape=(60, 60),
+                                   color=(24, 255, 107)):
             return False
 
         return True
@@ -311,8 +332,7 @@ class GridPredictor:
         return self.relative_rgb_count((-0.5, -1, 0.5, 0), color=(231, 138, 49), shape=(60, 60)) > 200
 
     def predict_mob_move_icon(self):
-        image = rgb2gray(self.relative_crop(area=(-0.5, -0.5, 0.5, 0.5), shape=(60, 60)))
-        return TEMPLATE_MOB_MOVE_ICON.match(image)
+        return self.relative_match(TEMPLATE_MOB_MOVE_ICON, (-0.5, -0.5, 0.5, 0.5), shape=(60, 60))
 
     @cached_property
     def _image_similar_piece(self):
@@ -55,6 +55,8 @@ class Homography:
 
     map_inner: np.ndarray
     _map_edge_count: tuple
+    # Predicted homo_loca of the next detect(), None to search the whole image
+    homo_track: np.ndarray
 
     def __init__(self, config):
         """
@@ -63,6 +65,7 @@ class Homography:
         """
         self.config = config
         self.homo_loaded = False
+        self.homo_track = None
 
     @cached_property
     def ui_mask_homo_stroke(self):
@@ -152,6 +155,7 @@ class Homography:
         self.homo_invt = cv2.invert(homo)[1]
         self.homo_size = tuple(size.tolist())
         self.homo_loaded = True
+        self.homo_track = None
 
     def detect(self, image):
         """
@@ -178,7 +182,9 @@ class Homography:
         # Image.fromarray(image_edge, mode='L').show()
 
         # Find free tile
-        if self.search_tile_center(image_edge, threshold_good=self.config.HOMO_CENTER_GOOD_THRESHOLD,
+        if self.search_tile_track(image_edge, threshold=self.config.HOMO_CENTER_GOOD_THRESHOLD):
+            pass
+        elif self.search_tile_center(image_edge, threshold_good=self.config.HOMO_CENTER_GOOD_THRESHOLD,
                                    threshold=self.config.HOMO_CENTER_THRESHOLD):
             pass
         elif self.search_tile_corner(image_edge, threshold=self.config.HOMO_CORNER_THRESHOLD):
@@ -186,9 +192,13 @@ class Homography:
         elif self.search_tile_rectangle(image_edge, threshold=self.config.HOMO_RECTANGLE_THRESHOLD):
             pass
         else:
+            self.homo_track = None
             raise MapDetectionError('Failed to find a free tile')
 
         self.homo_loca %= self.config.HOMO_TILE
+        if self.config.HOMO_TRACK:
+            # Camera usually stays still until next swipe
+            self.homo_track = self.homo_loca.copy()
 
         # Detect map edges
         self.lower_edge, self.upper_edge, self.left_edge, self.right_edge = False, False, False, False
@@ -214,6 +224,53 @@ class Homography:
             point2str(*self.homo_loca, length=3))
                     )
 
+    def search_tile_track(self, image, threshold=0.9):
+        """
+        Search for the center of empty tile, around the homo_loca of last detection only.
+        Camera usually stays still between swipes, and swipes don't move the camera exactly by grids,
+        so the lattice of last detection is used as prediction, without shifting it by swipes.
+        Tile centers are on a lattice of HOMO_TILE, so search windows are placed on the predicted lattice,
+        closest to the image center first, and stops at the first good match.
+        Only the closest 12 windows are searched, so a wrong prediction costs little before falling back.
+        This is a shortcut of search_tile_center(), ~1ms instead of ~40ms.
+
+        Args:
+            image (np.ndarray): Monochrome image.
+            threshold (float):
+
+        Returns:
+            bool: If success. False if no prediction or prediction is wrong.
+        """
+        if self.homo_track is None:
+            return False
+
+        window = self.config.HOMO_TRACK_WINDOW
+        template = ASSETS.tile_center_image
+        height, width = image.shape
+        start = self.homo_track + self.config.HOMO_CENTER_OFFSET
+        x = np.arange(-25, 25) * self.config.HOMO_TILE[0] + start[0]
+        x = x[(x >= window) & (x + template.shape[1] + window <= width)]
+        y = np.arange(-25, 25) * self.config.HOMO_TILE[1] + start[1]
+        y = y[(y >= window) & (y + template.shape[0] + window <= height)]
+        points = np.array(np.meshgrid(x, y)).reshape((2, -1)).T
+        points = points[np.argsort(np.linalg.norm(points - np.divide((width, height), 2), axis=1))][:12]
+
+        similarity = 0.
+        for point in np.round(points).astype(int):
+            x1, y1 = point - window
+            x2, y2 = point + template.shape[::-1] + window
+            result = cv2.matchTemplate(image[y1:y2, x1:x2], template, cv2.TM_CCOEFF_NORMED)
+            _, similarity, _, loca = cv2.minMaxLoc(result)
+            if similarity > threshold:
+                loca = np.add(loca, (x1, y1))
+                self.homo_loca = loca - self.config.HOMO_CENTER_OFFSET
+                self.map_inner = loca
+                logger.attr_align('tile_track', f'{float2str(similarity)} ({point2str(*(loca - point))} offset)')
+                return True
+
+        logger.attr_align('tile_track', f'{float2str(similarity)} (lost, {len(points)} windows)')
+        return False
+
     def search_tile_center(self, image, threshold_good=0.9, threshold=0.8, encourage=1.0):
         """
         Search for the center of empty tile.
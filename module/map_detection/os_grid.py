@@ -1,11 +1,13 @@
 from module.base.utils import *
 from module.map_detection.grid import Grid, GridInfo, GridPredictor
+from module.map_detection.grid_info import grid_columns
 from module.map_detection.utils_assets import ASSETS
 from module.os.assets import *
 from module.os.radar import RadarGrid
 from module.template.assets import *
 
 
+@grid_columns
 class OSGridInfo(GridInfo):
     is_os = True
 
@@ -25,6 +27,29 @@ class OSGridInfo(GridInfo):
 
     is_radar_scanned = False
 
+    COLUMNS = GridInfo.COLUMNS + (
+        'is_resource', 'is_exclamation', 'is_meowfficer', 'is_question', 'is_ally', 'is_akashi',
+        'is_scanning_device', 'is_logging_tower', 'is_exploration_reward', 'is_fleet_mechanism',
+        'is_radar_scanned',
+    )
+    WIPE_OUT = {
+        **GridInfo.WIPE_OUT,
+        'is_resource': False,
+        'is_exclamation': False,
+        'is_meowfficer': False,
+        'is_question': False,
+        'is_scanning_device': False,
+        'is_logging_tower': False,
+        'is_exploration_reward': False,
+        'is_fleet_mechanism': False,
+    }
+    RESET = {
+        **GridInfo.RESET,
+        'is_radar_scanned': False,
+        'is_ally': False,
+        'is_akashi': False,
+    }
+
     @property
     def is_interactive_only(self):
         # Fleet can't goto this grid, but can only interact next to it
@@ -123,32 +148,6 @@ class OSGridInfo(GridInfo):
 
         return True
 
-    def wipe_out(self):
-        """
-        Call this method when a fleet step on grid.
-        """
-        super().wipe_out()
-
-        self.is_enemy = False
-        self.is_resource = False
-        self.is_exclamation = False
-        self.is_meowfficer = False
-        self.is_question = False
-        self.is_scanning_device = False
-        self.is_logging_tower = False
-        self.is_exploration_reward = False
-        self.is_fleet_mechanism = False
-
-    def reset(self):
-        """
-        Call this method after entering a map.
-        """
-        super().reset()
-
-        self.is_radar_scanned = False
-        self.is_ally = False
-        self.is_akashi = False
-
 
 class OSGridPredictor(GridPredictor):
     def predict(self):
@@ -217,14 +216,12 @@ class OSGridPredictor(GridPredictor):
     }
 
     def predict_enemy_genre(self):
-        image = rgb2gray(self.relative_crop((-0.5, -1, 0.5, 0), shape=(60, 60)))
         for name, template in self._os_template_enemy.items():
-            if template.match(image):
+            if self.relative_match(template, (-0.5, -1, 0.5, 0), shape=(60, 60)):
                 return name
 
-        image = rgb2gray(self.relative_crop((-0.5, -2, 0.5, -1), shape=(60, 60)))
         for name, template in self._os_template_enemy_upper.items():
-            if template.match(image):
+            if self.relative_match(template, (-0.5, -2, 0.5, -1), shape=(60, 60)):
                 return name
 
         return None
@@ -238,13 +235,13 @@ class OSGridPredictor(GridPredictor):
         """
         point = (-0.385, 0.815)
         size = (0.53, 0.53)
-        image = self.relative_crop((point[0] - size[0], point[1] - size[1], point[0], point[1]), shape=(50, 50))
-        red = color_similarity_2d(image, (255, 130, 132))
-        yellow = color_similarity_2d(image, (255, 235, 156))
+        area = (point[0] - size[0], point[1] - size[1], point[0], point[1])
+        red = (255, 130, 132)
+        yellow = (255, 235, 156)
 
-        if TEMPLATE_ENEMY_L.match(red):
+        if self.relative_match(TEMPLATE_ENEMY_L, area, shape=(50, 50), color=red):
             scale = 3
-        elif TEMPLATE_ENEMY_M.match(yellow):
+        elif self.relative_match(TEMPLATE_ENEMY_M, area, shape=(50, 50), color=yellow):
             scale = 2
         # Disable the detection of 1 triangle enemies
         # In OS, light tower on map will detect to be 1 triangle enemy
@@ -256,8 +253,7 @@ class OSGridPredictor(GridPredictor):
         return scale
 
     def predict_resource(self):
-        image = rgb2gray(self.relative_crop((-0.5, -1, 0.5, 0), shape=(60, 60)))
-        return TEMPLATE_OS_Resource.match(image, similarity=0.85)
+        return self.relative_match(TEMPLATE_OS_Resource, (-0.5, -1, 0.5, 0), shape=(60, 60), similarity=0.85)
 
     def predict_meowfficer(self):
         image = rgb2gray(self.image_trans)
@@ -265,12 +261,10 @@ class OSGridPredictor(GridPredictor):
 
     def predict_ally(self):
         # Ally cargo ship in daily mission
-        image = rgb2gray(self.relative_crop((-0.5, -0.5, 0.5, 0.5), shape=(60, 60)))
-        return TEMPLATE_OS_AllyCargo.match(image, similarity=0.85)
+        return self.relative_match(TEMPLATE_OS_AllyCargo, (-0.5, -0.5, 0.5, 0.5), shape=(60, 60), similarity=0.85)
 
     def predict_akashi(self):
-        image = rgb2gray(self.relative_crop((-0.5, -1, 0.5, 0), shape=(60, 60)))
-        return TEMPLATE_SIREN_Akashi.match(image, similarity=0.85)
+        return self.relative_match(TEMPLATE_SIREN_Akashi, (-0.5, -1, 0.5, 0), shape=(60, 60), similarity=0.85)
 
     def predict_caught_by_siren(self):
         # Detect the red slash background of `In action`.
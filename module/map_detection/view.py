@@ -2,11 +2,13 @@ import collections
 import time
 
 from module.base.utils import *
+from module.device.method.pool import WORKER_POOL
 from module.exception import MapDetectionError
 from module.logger import logger
 from module.map.map_grids import SelectedGrids
 from module.map_detection.detector import MapDetector
 from module.map_detection.grid import Grid
+from module.map_detection.grid_batch import GridBatch, batch_cost_str
 from module.map_detection.utils import *
 from module.map_detection.utils_assets import *
 
@@ -97,14 +99,44 @@ class View(MapDetector):
                 raise MapDetectionError(f'Camera outside map: offset=({x}, {y})')
             break
 
+    @staticmethod
+    def _predict_batch(batch):
+        """
+        Predict grids in a GridBatch, grids are modified inplace.
+
+        Args:
+            batch (GridBatch):
+        """
+        for index, grid in enumerate(batch.grids):
+            grid.batch, grid.batch_index = batch, index
+        try:
+            for grid in batch.grids:
+                grid.predict()
+        finally:
+            for grid in batch.grids:
+                grid.batch = None
+
     def predict(self):
         """
         Predict grid info.
+
+        If `Optimization_MapDetectionWorkers` > 1, grids are split into contiguous chunks and predicted
+        on WORKER_POOL, OpenCV releases GIL so chunks run in parallel.
+        Each grid is predicted by one thread only and results are set on the grid itself,
+        so results are the same as predicting in the current thread.
         """
         start_time = time.time()
-        for grid in self:
-            grid.predict()
-        logger.attr_align('predict', len(self.grids.keys()), front=float2str(time.time() - start_time) + 's')
+        grids = list(self)
+        workers = min(max(int(self.config.Optimization_MapDetectionWorkers), 1), 4, len(grids))
+        if workers > 1:
+            chunks = [grids[len(grids) * i // workers:len(grids) * (i + 1) // workers] for i in range(workers)]
+            batches = [GridBatch(chunk) for chunk in chunks]
+            WORKER_POOL.thread_map(self._predict_batch, batches)
+        else:
+            batches = [GridBatch(grids)]
+            self._predict_batch(batches[0])
+        logger.attr_align('predict', f'{len(grids)} x{len(batches)} ({batch_cost_str(batches)})',
+                          front=float2str(time.time() - start_time) + 's')
 
     def update(self, image):
         """
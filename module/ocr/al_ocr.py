@@ -8,6 +8,7 @@ from module.exception import RequestHumanTakeover
 from module.logger import logger
 
 logger.info('Loading OCR dependencies')
+import mxnet as mx
 from cnocr import CnOcr
 from cnocr.cn_ocr import (check_model_name, data_dir, gen_network, load_module,
                           read_charset)
@@ -42,6 +43,8 @@ class AlOcr(CnOcr):
     ):
         self._args = (model_name, model_epoch, cand_alphabet, root, context, name)
         self._model_loaded = False
+        # Key: cand_alphabet. Value: np.ndarray, mask on num_classes
+        self._cand_mask = {}
 
     def init(self,
              model_name='densenet-lite-gru',
@@ -145,6 +148,58 @@ class AlOcr(CnOcr):
 
         return super().ocr_for_single_lines(img_list)
 
+    def atomic_ocr_for_batch(self, img_list, cand_alphabet_list):
+        """
+        Like atomic_ocr_for_single_lines(), but each image has its own alphabet,
+        so images from different Ocr objects can be predicted in one forward pass.
+        Candidate alphabet is a mask applied on output probabilities, so it can differ in a batch.
+
+        Args:
+            img_list (list[np.ndarray]):
+            cand_alphabet_list (list[str]): Alphabet of each image, None for no limit.
+
+        Returns:
+            list[list[str]]:
+        """
+        if not self._model_loaded:
+            self.init(*self._args)
+            self._model_loaded = True
+        if len(img_list) == 0:
+            return []
+
+        img_list = [self._preprocess_img_array(img) for img in img_list]
+        batch_size = len(img_list)
+        img_list, img_widths = self._pad_arrays(img_list)
+        prob = self._predict(mx.nd.array(img_list))
+        # [seq_len, batch_size, num_classes]
+        prob = np.reshape(prob, (-1, batch_size, prob.shape[1]))
+
+        max_width = max(img_widths)
+        res = []
+        for index, cand_alphabet in enumerate(cand_alphabet_list):
+            line_prob = prob[:, index, :]
+            if cand_alphabet is not None:
+                line_prob = line_prob * self._get_cand_mask(cand_alphabet)
+            res.append(self._gen_line_pred_chars(line_prob, img_widths[index], max_width))
+        return res
+
+    def _get_cand_mask(self, cand_alphabet):
+        """
+        Same as the mask generated in CnOcr, but cached and on a single line.
+
+        Args:
+            cand_alphabet (str):
+
+        Returns:
+            np.ndarray: Shape (num_classes,)
+        """
+        mask = self._cand_mask.get(cand_alphabet)
+        if mask is None:
+            mask = np.zeros(len(self._alphabet), dtype='int8')
+            mask[[0] + [self._inv_alph_dict[word] for word in cand_alphabet]] = 1
+            self._cand_mask[cand_alphabet] = mask
+        return mask
+
     def _assert_and_prepare_model_files(self):
         model_dir = self._model_dir
         model_files = [
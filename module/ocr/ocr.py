@@ -1,4 +1,7 @@
+import hashlib
+import threading
 import time
+from collections import OrderedDict
 from datetime import timedelta
 from typing import TYPE_CHECKING
 
@@ -19,9 +22,108 @@ else:
     OCR_MODEL = ModelProxyFactory()
 
 
+class OcrCache:
+    def __init__(self, size=512, log_interval=200):
+        """
+        LRU cache of OCR results, keyed by exact hash of pre-processed images.
+
+        Resource bars, timers and item names stay the same between frames,
+        cached results skip the model prediction, which costs 5-20ms per call.
+        Pre-processed images are hashed so images with different raw pixels
+        but same extracted letters share the result.
+
+        Args:
+            size (int): Max number of cached lines.
+            log_interval (int): Log hit/miss counters every N lookups.
+        """
+        self.size = size
+        self.log_interval = log_interval
+        self.cache = OrderedDict()
+        self.hit = 0
+        self.miss = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(lang, alphabet, image):
+        """
+        Args:
+            lang (str):
+            alphabet (str):
+            image (np.ndarray): Pre-processed image.
+
+        Returns:
+            tuple:
+        """
+        image = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(image, digest_size=16).digest()
+        return lang, alphabet, image.shape, image.dtype.str, digest
+
+    def predict(self, model, lang, image_list, alphabet_list):
+        """
+        Get results from cache, and predict missing ones in one call.
+
+        Args:
+            model (AlOcr):
+            lang (str):
+            image_list (list[np.ndarray]):
+            alphabet_list (list[str]):
+
+        Returns:
+            list[list[str]]:
+        """
+        keys = [self.key(lang, alphabet, image) for image, alphabet in zip(image_list, alphabet_list)]
+        result_list = [None] * len(keys)
+        with self.lock:
+            for index, key in enumerate(keys):
+                result = self.cache.get(key)
+                if result is not None:
+                    self.cache.move_to_end(key)
+                    result_list[index] = result
+        missing = [index for index, result in enumerate(result_list) if result is None]
+
+        if missing:
+            images = [image_list[index] for index in missing]
+            alphabets = [alphabet_list[index] for index in missing]
+            if len(set(alphabets)) == 1:
+                predicted = model.atomic_ocr_for_single_lines(images, alphabets[0])
+            else:
+                predicted = model.atomic_ocr_for_batch(images, alphabets)
+            for index, result in zip(missing, predicted):
+                result_list[index] = result
+
+        with self.lock:
+            for index in missing:
+                self.cache[keys[index]] = result_list[index]
+            while len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+            self.hit += len(keys) - len(missing)
+            self.miss += len(missing)
+            total = self.hit + self.miss
+            if total and total // self.log_interval != (total - len(keys)) // self.log_interval:
+                logger.info(self)
+
+        return result_list
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def __str__(self):
+        total = self.hit + self.miss
+        rate = self.hit / total * 100 if total else 0.
+        return f'OcrCache(hit={self.hit}, miss={self.miss}, rate={rate:.1f}%, cached={len(self.cache)})'
+
+
+OCR_CACHE = OcrCache()
+
+
 class Ocr:
     SHOW_LOG = True
     SHOW_REVISE_WARNING = False
+    # Use OCR_CACHE, set False if results of the same image may differ, which shouldn't happen
+    USE_CACHE = True
+    # Raw results predicted by OcrBatch, consumed by the next ocr() call
+    _batch_result = None
 
     def __init__(self, buttons, lang='azur_lane', letter=(255, 255, 255), threshold=128, alphabet=None, name=None):
         """
@@ -79,6 +181,20 @@ class Ocr:
         """
         return result
 
+    def ocr_images(self, image, direct_ocr=False):
+        """
+        Args:
+            image (np.ndarray, list[np.ndarray]):
+            direct_ocr (bool): True to skip preprocess.
+
+        Returns:
+            list[np.ndarray]: Images to feed OCR model.
+        """
+        if direct_ocr:
+            return [self.pre_process(i) for i in image]
+        else:
+            return [self.pre_process(crop(image, area)) for area in self.buttons]
+
     def ocr(self, image, direct_ocr=False):
         """
         Args:
@@ -90,15 +206,19 @@ class Ocr:
         """
         start_time = time.time()
 
-        if direct_ocr:
-            image_list = [self.pre_process(i) for i in image]
+        if self._batch_result is not None:
+            result_list, self._batch_result = self._batch_result, None
         else:
-            image_list = [self.pre_process(crop(image, area)) for area in self.buttons]
+            image_list = self.ocr_images(image, direct_ocr=direct_ocr)
 
-        # This will show the images feed to OCR model
-        # self.cnocr.debug(image_list)
+            # This will show the images feed to OCR model
+            # self.cnocr.debug(image_list)
 
-        result_list = self.cnocr.atomic_ocr_for_single_lines(image_list, self.alphabet)
+            if self.USE_CACHE:
+                result_list = OCR_CACHE.predict(
+                    self.cnocr, self.lang, image_list, [self.alphabet] * len(image_list))
+            else:
+                result_list = self.cnocr.atomic_ocr_for_single_lines(image_list, self.alphabet)
         result_list = [''.join(result) for result in result_list]
         result_list = [self.after_process(result) for result in result_list]
 
@@ -111,6 +231,76 @@ class Ocr:
         return result_list
 
 
+class OcrBatch:
+    def __init__(self):
+        """
+        Do OCR of multiple Ocr objects on the same screenshot, with one model prediction for each language.
+
+        Images from all Ocr objects are padded into one batch, each keeps its own alphabet.
+        Results are returned as what each `Ocr.ocr()` returns, so subclasses that post-process
+        results in ocr(), like Digit, DigitCounter and Duration, work as usual.
+
+        Examples:
+            batch = OcrBatch()
+            batch.add(OCR_OIL, image)
+            batch.add(OCR_COIN, image)
+            batch.add(OCR_DURATION, image)
+            oil, coin, duration = batch.run()
+        """
+        # (Ocr, image, direct_ocr)
+        self.tasks = []
+
+    def add(self, ocr, image, direct_ocr=False):
+        """
+        Args:
+            ocr (Ocr):
+            image (np.ndarray, list[np.ndarray]): Same as Ocr.ocr()
+            direct_ocr (bool): Same as Ocr.ocr()
+
+        Returns:
+            OcrBatch: self, for chain calls.
+        """
+        self.tasks.append((ocr, image, direct_ocr))
+        return self
+
+    def run(self):
+        """
+        Returns:
+            list: Result of each Ocr object, in the order they were added.
+        """
+        tasks, self.tasks = self.tasks, []
+        start_time = time.time()
+
+        # Key: (lang, use_cache). Value: list of (task index, image, alphabet)
+        groups = {}
+        for index, (ocr, image, direct_ocr) in enumerate(tasks):
+            for image in ocr.ocr_images(image, direct_ocr=direct_ocr):
+                groups.setdefault((ocr.lang, ocr.USE_CACHE), []).append((index, image, ocr.alphabet))
+
+        raw = [[] for _ in tasks]
+        for (lang, use_cache), items in groups.items():
+            model = OCR_MODEL.__getattribute__(lang)
+            image_list = [image for _, image, _ in items]
+            alphabet_list = [alphabet for _, _, alphabet in items]
+            if use_cache:
+                result_list = OCR_CACHE.predict(model, lang, image_list, alphabet_list)
+            else:
+                result_list = model.atomic_ocr_for_batch(image_list, alphabet_list)
+            for (index, _, _), result in zip(items, result_list):
+                raw[index].append(result)
+        logger.info(f'OcrBatch: {len(tasks)} objects, {len(groups)} groups, '
+                    f'{float2str(time.time() - start_time)}s')
+
+        results = []
+        for (ocr, image, direct_ocr), result_list in zip(tasks, raw):
+            ocr._batch_result = result_list
+            try:
+                results.append(ocr.ocr(image, direct_ocr=direct_ocr))
+            finally:
+                ocr._batch_result = None
+        return results
+
+
 class OcrYuv(Ocr):
     """
     Do OCR in the Y channel of the YUV color space.
@@ -1,30 +1,57 @@
 import argparse
+import asyncio
 import multiprocessing
+import os
 import pickle
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 from module.logger import logger
 from module.webui.setting import State
 
 process: multiprocessing.Process = None
 
+OCR_LANGS = ["azur_lane", "cnocr", "jp", "tw", "azur_lane_jp"]
+
 
 class ModelProxy:
+    """
+    Client of OCR server.
+
+    Requests are pickled and sent in the frame format of multiprocessing.connection,
+    so the client is a plain multiprocessing.connection.Client.
+    Falls back to local models if server is not available,
+    and reconnects after a backoff, which doubles on each failure.
+    """
     client = None
-    online = True
+    timeout = 10
+    lock = threading.Lock()
+    # Seconds to wait before reconnecting
+    BACKOFF_MIN = 5
+    BACKOFF_MAX = 300
+    backoff = 0
+    # Time that server can be connected again
+    reconnect_time = 0.
 
     @classmethod
     def init(cls, address="127.0.0.1:22268"):
-        import zerorpc
+        from multiprocessing.connection import Client
 
         logger.info(f"Connecting to OCR server {address}")
-        cls.client = zerorpc.Client(timeout=5)
-        cls.client.connect(f"tcp://{address}")
+        host, port = address.rsplit(":", 1)
         try:
-            cls.client.hello()
+            cls.client = Client((host, int(port)))
+            cls.call("hello")
+            cls.backoff = 0
             logger.info("Successfully connected to OCR server")
-        except:
-            cls.online = False
-            logger.warning("Ocr server not running")
+        except Exception:
+            cls.drop()
+            logger.warning(f"Ocr server not running, retry in {cls.backoff}s")
 
     @classmethod
     def close(cls):
@@ -34,9 +61,65 @@ class ModelProxy:
             logger.info('Successfully disconnected to OCR server')
             cls.client = None
 
+    @classmethod
+    def drop(cls):
+        """
+        Disconnect OCR server after an error, a late response would mess up the connection.
+        Local models are used until reconnected after a backoff.
+        """
+        cls.backoff = min(max(cls.backoff * 2, cls.BACKOFF_MIN), cls.BACKOFF_MAX)
+        cls.reconnect_time = time.time() + cls.backoff
+        if cls.client is not None:
+            try:
+                cls.client.close()
+            except Exception:
+                pass
+            cls.client = None
+
+    @classmethod
+    def should_connect(cls):
+        """
+        Returns:
+            bool: If not connected and backoff passed.
+        """
+        return cls.client is None and time.time() >= cls.reconnect_time
+
+    @classmethod
+    def call(cls, method, *args):
+        """
+        Args:
+            method (str): Method name of AlOcr, or "hello", "metrics".
+            *args: lang and arguments of the method.
+
+        Returns:
+            Any:
+
+        Raises:
+            TimeoutError:
+            RuntimeError: If server raised an error.
+        """
+        with cls.lock:
+            cls.client.send((method, args))
+            if not cls.client.poll(cls.timeout):
+                raise TimeoutError(f"OCR server no response in {cls.timeout}s")
+            status, result = cls.client.recv()
+        if status != "ok":
+            raise RuntimeError(result)
+        return result
+
     def __init__(self, lang) -> None:
         self.lang = lang
 
+    def _call(self, method, *args):
+        if self.client is not None:
+            try:
+                return self.call(method, self.lang, *args)
+            except Exception as e:
+                logger.warning(f"OCR server error: {e}")
+                self.drop()
+        from module.ocr.models import OCR_MODEL
+        return getattr(OCR_MODEL.__getattribute__(self.lang), method)(*args)
+
     def ocr(self, img_fp):
         """
         Args:
@@ -45,14 +128,7 @@ class ModelProxy:
         Returns:
 
         """
-        if self.online:
-            img_str = img_fp.dumps()
-            try:
-                return self.client("ocr", self.lang, img_str)
-            except:
-                self.online = False
-        from module.ocr.models import OCR_MODEL
-        return OCR_MODEL.__getattribute__(self.lang).ocr(img_fp)
+        return self._call("ocr", img_fp)
 
     def ocr_for_single_line(self, img_fp):
         """
@@ -62,14 +138,7 @@ class ModelProxy:
         Returns:
 
         """
-        if self.online:
-            img_str = img_fp.dumps()
-            try:
-                return self.client("ocr_for_single_line", self.lang, img_str)
-            except:
-                self.online = False
-        from module.ocr.models import OCR_MODEL
-        return OCR_MODEL.__getattribute__(self.lang).ocr_for_single_line(img_fp)
+        return self._call("ocr_for_single_line", img_fp)
 
     def ocr_for_single_lines(self, img_list):
         """
@@ -79,23 +148,14 @@ class ModelProxy:
         Returns:
 
         """
-        if self.online:
-            img_str_list = [img_fp.dumps() for img_fp in img_list]
-            try:
-                return self.client("ocr_for_single_lines", self.lang, img_str_list)
-            except:
-                self.online = False
-        from module.ocr.models import OCR_MODEL
-        return OCR_MODEL.__getattribute__(self.lang).ocr_for_single_lines(img_list)
+        return self._call("ocr_for_single_lines", img_list)
 
     def set_cand_alphabet(self, cand_alphabet: str):
-        if self.online:
-            try:
-                return self.client("set_cand_alphabet", self.lang, cand_alphabet)
-            except:
-                self.online = False
-        from module.ocr.models import OCR_MODEL
-        return OCR_MODEL.__getattribute__(self.lang).set_cand_alphabet(cand_alphabet)
+        """
+        Models on server are shared by all clients, this has no effect on server.
+        Use the atomic methods instead.
+        """
+        return self._call("set_cand_alphabet", cand_alphabet)
 
     def atomic_ocr(self, img_fp, cand_alphabet=None):
         """
@@ -106,14 +166,7 @@ class ModelProxy:
         Returns:
 
         """
-        if self.online:
-            img_str = img_fp.dumps()
-            try:
-                return self.client("atomic_ocr", self.lang, img_str, cand_alphabet)
-            except:
-                self.online = False
-        from module.ocr.models import OCR_MODEL
-        return OCR_MODEL.__getattribute__(self.lang).atomic_ocr(img_fp, cand_alphabet)
+        return self._call("atomic_ocr", img_fp, cand_alphabet)
 
     def atomic_ocr_for_single_line(self, img_fp, cand_alphabet=None):
         """
@@ -124,14 +177,7 @@ class ModelProxy:
         Returns:
 
         """
-        if self.online:
-            img_str = img_fp.dumps()
-            try:
-                return self.client("atomic_ocr_for_single_line", self.lang, img_str, cand_alphabet)
-            except:
-                self.online = False
-        from module.ocr.models import OCR_MODEL
-        return OCR_MODEL.__getattribute__(self.lang).atomic_ocr_for_single_line(img_fp, cand_alphabet)
+        return self._call("atomic_ocr_for_single_line", img_fp, cand_alphabet)
 
     def atomic_ocr_for_single_lines(self, img_list, cand_alphabet=None):
         """
@@ -142,14 +188,18 @@ class ModelProxy:
         Returns:
 
         """
-        if self.online:
-            img_str_list = [img_fp.dumps() for img_fp in img_list]
-            try:
-                return self.client("atomic_ocr_for_single_lines", self.lang, img_str_list, cand_alphabet)
-            except:
-                self.online = False
-        from module.ocr.models import OCR_MODEL
-        return OCR_MODEL.__getattribute__(self.lang).atomic_ocr_for_single_lines(img_list, cand_alphabet)
+        return self._call("atomic_ocr_for_single_lines", img_list, cand_alphabet)
+
+    def atomic_ocr_for_batch(self, img_list, cand_alphabet_list):
+        """
+        Args:
+            img_list (list[np.ndarray]):
+            cand_alphabet_list (list[str]):
+
+        Returns:
+
+        """
+        return self._call("atomic_ocr_for_batch", img_list, cand_alphabet_list)
 
     def debug(self, img_list):
         """
@@ -159,20 +209,13 @@ class ModelProxy:
         Returns:
 
         """
-        if self.online:
-            img_str_list = [img_fp.dumps() for img_fp in img_list]
-            try:
-                return self.client("debug", self.lang, img_str_list)
-            except:
-                self.online = False
-        from module.ocr.models import OCR_MODEL
-        return OCR_MODEL.__getattribute__(self.lang).debug(img_list)
+        return self._call("debug", img_list)
 
 
 class ModelProxyFactory:
     def __getattribute__(self, __name: str) -> ModelProxy:
-        if __name in ["azur_lane", "cnocr", "jp", "tw", "azur_lane_jp"]:
-            if ModelProxy.client is None:
+        if __name in OCR_LANGS:
+            if ModelProxy.should_connect():
                 ModelProxy.init(address=State.deploy_config.OcrClientAddress)
             return ModelProxy(lang=__name)
         else:
@@ -182,75 +225,316 @@ class ModelProxyFactory:
         ModelProxy.close()
 
 
-def start_ocr_server(port=22268):
-    import zerorpc
-    import zmq
-    from module.ocr.al_ocr import AlOcr
+"""
+OCR server, running in a standalone process.
+
+Front end is an asyncio server receiving requests from all alas instances.
+Line OCR requests of the same model are merged into one atomic_ocr_for_batch() call
+and run in a pool of worker processes, each of them loads its own models.
+Requests are not delayed to wait for a batch, they are merged when all workers are busy,
+so batches grow with load and latency stays low when idle.
+"""
+
+# Model in worker processes
+WORKER_MODEL = None
+
+
+def _worker_init(parent):
+    """
+    Args:
+        parent (int): Process ID of OCR server.
+    """
+    global WORKER_MODEL
+    thread = threading.Thread(target=_worker_watch_parent, args=(parent,), name="OcrWorkerWatcher", daemon=True)
+    thread.start()
     from module.ocr.models import OcrModel
+    WORKER_MODEL = OcrModel()
 
-    class OCRServer(OcrModel):
-        def hello(self):
-            return "hello"
 
-        def ocr(self, lang, img_fp):
-            img_fp = pickle.loads(img_fp)
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.ocr(img_fp)
-
-        def ocr_for_single_line(self, lang, img_fp):
-            img_fp = pickle.loads(img_fp)
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.ocr_for_single_line(img_fp)
-
-        def ocr_for_single_lines(self, lang, img_list):
-            img_list = [pickle.loads(img_fp) for img_fp in img_list]
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.ocr_for_single_lines(img_list)
-
-        def set_cand_alphabet(self, lang, cand_alphabet):
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.set_cand_alphabet(cand_alphabet)
-
-        def atomic_ocr(self, lang, img_fp, cand_alphabet):
-            img_fp = pickle.loads(img_fp)
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.atomic_ocr(img_fp, cand_alphabet)
-
-        def atomic_ocr_for_single_line(self, lang, img_fp, cand_alphabet):
-            img_fp = pickle.loads(img_fp)
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.atomic_ocr_for_single_line(img_fp, cand_alphabet)
-
-        def atomic_ocr_for_single_lines(self, lang, img_list, cand_alphabet):
-            img_list = [pickle.loads(img_fp) for img_fp in img_list]
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.atomic_ocr_for_single_lines(img_list, cand_alphabet)
-
-        def debug(self, lang, img_list):
-            img_list = [pickle.loads(img_fp) for img_fp in img_list]
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.debug(img_list)
-
-    server = zerorpc.Server(OCRServer())
+def _worker_watch_parent(parent, interval=1):
+    """
+    Exit worker if OCR server is gone, workers are left blocking on the call queue
+    if server is killed without shutting down the pool.
+    """
+    import psutil
     try:
-        server.bind(f"tcp://*:{port}")
-    except zmq.error.ZMQError:
-        logger.error(f"Ocr server cannot bind on port {port}")
-        return
-    logger.info(f"Ocr server listen on port {port}")
-    server.run()
+        parent = psutil.Process(parent)
+        while parent.is_running():
+            time.sleep(interval)
+    except psutil.Error:
+        pass
+    os._exit(0)
+
+
+def _worker_call(lang, method, args):
+    model = WORKER_MODEL.__getattribute__(lang)
+    return getattr(model, method)(*args)
+
+
+def _batch_args(method, args):
+    """
+    Convert arguments of line OCR methods to atomic_ocr_for_batch().
+
+    Returns:
+        tuple[list[np.ndarray], list[str], bool]: Image list, alphabet list, if is single line.
+            Or None if method can't be batched.
+    """
+    if method == "ocr_for_single_lines":
+        return args[0], [None] * len(args[0]), False
+    if method == "atomic_ocr_for_single_lines":
+        return args[0], [args[1]] * len(args[0]), False
+    if method == "atomic_ocr_for_batch":
+        return args[0], args[1], False
+    if method == "ocr_for_single_line":
+        return [args[0]], [None], True
+    if method == "atomic_ocr_for_single_line":
+        return [args[0]], [args[1]], True
+    return None
+
+
+class ServerMetrics:
+    def __init__(self, window=1000):
+        """
+        Args:
+            window (int): Number of recent requests to calculate latency.
+        """
+        self.requests = 0
+        self.images = 0
+        self.batches = 0
+        self.batch_images = 0
+        # Seconds from request received to response sent
+        self.latency = deque(maxlen=window)
+        # Seconds from request received to batch started
+        self.wait = deque(maxlen=window)
+
+    def dict(self, queue=0, in_flight=0):
+        def percentile(data, q):
+            return round(float(np.percentile(data, q)) * 1000, 1) if data else 0.
+
+        return {
+            "requests": self.requests,
+            "images": self.images,
+            "batches": self.batches,
+            "batch_size": round(self.batch_images / self.batches, 2) if self.batches else 0.,
+            "latency_p50": percentile(self.latency, 50),
+            "latency_p95": percentile(self.latency, 95),
+            "wait_p95": percentile(self.wait, 95),
+            "queue": queue,
+            "in_flight": in_flight,
+        }
+
+
+class OcrServer:
+    # Max images in a batch
+    MAX_BATCH = 128
+    # Seconds between two metrics logs
+    LOG_INTERVAL = 60
+
+    def __init__(self, port=22268, workers=2):
+        """
+        Args:
+            port (int):
+            workers (int): Number of worker processes.
+        """
+        self.port = port
+        self.workers = max(int(workers), 1)
+        self.pool = None
+        # Key: lang. Value: list of (img_list, alphabet_list, future, received time)
+        self.pending = {}
+        self.in_flight = 0
+        # Number of run_single() waiting for an idle worker, workers are kept for them
+        self.waiting = 0
+        # Notified when a worker becomes idle, created in run() within the event loop
+        self.idle: asyncio.Condition = None
+        self.metrics = ServerMetrics()
+
+    @property
+    def queue(self):
+        return sum(len(request[0]) for requests in self.pending.values() for request in requests)
+
+    def schedule(self):
+        """
+        Send pending requests to idle workers, the model waiting longest goes first.
+        """
+        while self.in_flight + self.waiting < self.workers:
+            langs = [lang for lang, requests in self.pending.items() if requests]
+            if not langs:
+                return
+            lang = min(langs, key=lambda k: self.pending[k][0][3])
+            requests = self.pending[lang]
+            batch, images = [], 0
+            while requests and (not batch or images + len(requests[0][0]) <= self.MAX_BATCH):
+                request = requests.pop(0)
+                batch.append(request)
+                images += len(request[0])
+            self.in_flight += 1
+            asyncio.ensure_future(self.run_batch(lang, batch))
+
+    async def run_batch(self, lang, batch):
+        now = time.time()
+        img_list, alphabet_list = [], []
+        for images, alphabets, _, received in batch:
+            img_list += images
+            alphabet_list += alphabets
+            self.metrics.wait.append(now - received)
+        self.metrics.batches += 1
+        self.metrics.batch_images += len(img_list)
+
+        loop = asyncio.get_event_loop()
+        try:
+            result_list = await loop.run_in_executor(
+                self.pool, _worker_call, lang, "atomic_ocr_for_batch", (img_list, alphabet_list))
+        except Exception as e:
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            start = 0
+            for images, _, future, _ in batch:
+                if not future.done():
+                    future.set_result(result_list[start:start + len(images)])
+                start += len(images)
+        finally:
+            await self.release()
+
+    async def release(self):
+        """
+        Release a worker, wake up run_single() first, then schedule batches.
+        """
+        self.in_flight -= 1
+        async with self.idle:
+            self.idle.notify_all()
+        self.schedule()
 
+    async def run_single(self, lang, method, args):
+        """
+        Run methods that can't be batched, they still occupy a worker.
+        """
+        self.waiting += 1
+        try:
+            async with self.idle:
+                await self.idle.wait_for(lambda: self.in_flight < self.workers)
+                self.in_flight += 1
+        finally:
+            self.waiting -= 1
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self.pool, _worker_call, lang, method, args)
+        finally:
+            await self.release()
 
-def start_ocr_server_process(port=22268):
+    async def dispatch(self, method, args):
+        if method == "hello":
+            return "hello"
+        if method == "metrics":
+            return self.metrics.dict(queue=self.queue, in_flight=self.in_flight)
+
+        lang, args = args[0], args[1:]
+        if lang not in OCR_LANGS:
+            raise ValueError(f"Unknown OCR model: {lang}")
+        if method == "set_cand_alphabet":
+            return None
+
+        batch_args = _batch_args(method, args)
+        if batch_args is None:
+            return await self.run_single(lang, method, args)
+
+        img_list, alphabet_list, single = batch_args
+        self.metrics.images += len(img_list)
+        if not img_list:
+            return []
+        future = asyncio.get_event_loop().create_future()
+        self.pending.setdefault(lang, []).append((img_list, alphabet_list, future, time.time()))
+        self.schedule()
+        result_list = await future
+        return result_list[0] if single else result_list
+
+    @staticmethod
+    async def read_frame(reader):
+        size, = struct.unpack("!i", await reader.readexactly(4))
+        if size == -1:
+            size, = struct.unpack("!Q", await reader.readexactly(8))
+        return pickle.loads(await reader.readexactly(size))
+
+    @staticmethod
+    def write_frame(writer, obj):
+        data = pickle.dumps(obj)
+        if len(data) > 0x7fffffff:
+            writer.write(struct.pack("!i", -1) + struct.pack("!Q", len(data)))
+        else:
+            writer.write(struct.pack("!i", len(data)))
+        writer.write(data)
+
+    async def handle_client(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        logger.info(f"Ocr client connected: {peer}")
+        try:
+            while 1:
+                method, args = await self.read_frame(reader)
+                received = time.time()
+                self.metrics.requests += 1
+                try:
+                    response = ("ok", await self.dispatch(method, args))
+                except Exception as e:
+                    logger.warning(f"Ocr request {method} failed, {type(e).__name__}: {e}")
+                    response = ("error", f"{type(e).__name__}: {e}")
+                self.write_frame(writer, response)
+                await writer.drain()
+                self.metrics.latency.append(time.time() - received)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            logger.info(f"Ocr client disconnected: {peer}")
+            writer.close()
+
+    async def log_metrics(self):
+        requests = 0
+        while 1:
+            await asyncio.sleep(self.LOG_INTERVAL)
+            if self.metrics.requests == requests:
+                continue
+            requests = self.metrics.requests
+            logger.info(f"Ocr server metrics: {self.metrics.dict(queue=self.queue, in_flight=self.in_flight)}")
+
+    async def run(self):
+        try:
+            server = await asyncio.start_server(self.handle_client, host="0.0.0.0", port=self.port)
+        except OSError:
+            logger.error(f"Ocr server cannot bind on port {self.port}")
+            return
+        self.idle = asyncio.Condition()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_worker_init, initargs=(os.getpid(),))
+        logger.info(f"Ocr server listen on port {self.port}, workers: {self.workers}")
+        asyncio.ensure_future(self.log_metrics())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown()
+
+
+def start_ocr_server(port=22268, workers=2):
+    server = OcrServer(port=port, workers=workers)
+    asyncio.run(server.run())
+
+
+def start_ocr_server_process(port=22268, workers=2):
     global process
     if not alive():
-        process = multiprocessing.Process(target=start_ocr_server, args=(port,))
+        process = multiprocessing.Process(target=start_ocr_server, args=(port, workers))
         process.start()
 
 
 def stop_ocr_server_process():
     global process
     if alive():
+        import psutil
+        # Kill workers first, instead of leaving them until they notice server is gone
+        try:
+            for child in psutil.Process(process.pid).children(recursive=True):
+                child.kill()
+        except psutil.Error:
+            pass
         process.kill()
         process = None
 
@@ -271,6 +555,12 @@ if __name__ == "__main__":
         type=int,
         help="Port to listen. Default to OcrServerPort in deploy setting",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes. Default to OcrServerWorkers in deploy setting",
+    )
     args, _ = parser.parse_known_args()
     port = args.port or State.deploy_config.OcrServerPort
-    start_ocr_server(port=port)
+    workers = args.workers or State.deploy_config.OcrServerWorkers
+    start_ocr_server(port=port, workers=workers)
@@ -1,5 +1,6 @@
 from module.base.utils import *
 from module.map.map_base import CampaignMap, camera_2d
+from module.map.map_grids import GridColumns
 from module.map_detection.os_grid import OSGridInfo
 
 
@@ -15,18 +16,20 @@ class OSCampaignMap(CampaignMap):
     @shape.setter
     def shape(self, scale):
         self._shape = node2location(scale.upper())
+        self.clear_compiled()
+        self._grid_index = None
         for y in range(self._shape[1] + 1):
             for x in range(self._shape[0] + 1):
                 grid = OSGridInfo()
                 grid.location = (x, y)
                 self.grids[(x, y)] = grid
+        self.columns = GridColumns(self.grids.values())
 
         # camera_data can be generate automatically, but it's better to set it manually.
         self.camera_data = [location2node(loca) for loca in camera_2d((0, 0, *self._shape), sight=self.camera_sight)]
         self.camera_data_spawn_point = []
         # weight_data set to 10.
-        for grid in self:
-            grid.weight = 10.
+        self.columns.fill('weight', 10.)
 
     def update(self, grids, camera, mode='normal'):
         """
@@ -1,5 +1,8 @@
 import traceback
+from collections import Counter
 
+import module.config.server as server
+from module.base.utils import area_cross_area
 from module.coalition.assets import *
 from module.event_hospital.assets import HOSIPITAL_CHECK
 from module.freebies.assets import MAIL_ENTER
@@ -13,6 +16,14 @@ class Page:
     # Key: str, page name like "page_main"
     # Value: Page, page instance
     all_pages = {}
+    # Key: tuple[Page, Page], (previous page, detected page)
+    # Value: int, times observed
+    transitions = Counter()
+    # Key: tuple[str, tuple], (server, offset)
+    # Value: dict[Page, list[Page]], see conflict_pages()
+    _conflicts = {}
+    # Key: Page. Value: dict[Page, int], see distance_from()
+    _distance = {}
 
     @classmethod
     def clear_connection(cls):
@@ -53,6 +64,102 @@ class Page:
         for page in cls.all_pages.values():
             yield page.check_button
 
+    @classmethod
+    def distance_from(cls, start):
+        """
+        Args:
+            start (Page):
+
+        Returns:
+            dict[Page, int]: Number of links from start page, links are considered bidirectional.
+        """
+        if start in cls._distance:
+            return cls._distance[start]
+
+        distance = {start: 0}
+        queue = [start]
+        while queue:
+            new = []
+            for page in queue:
+                neighbours = list(page.links.keys())
+                neighbours += [link for link in cls.iter_pages() if page in link.links]
+                for link in neighbours:
+                    if link not in distance:
+                        distance[link] = distance[page] + 1
+                        new.append(link)
+            queue = new
+
+        cls._distance[start] = distance
+        return distance
+
+    @classmethod
+    def iter_pages_by_likelihood(cls, last=None):
+        """
+        Iterate pages with check button, most likely pages first.
+        Likelihood is learned from page transitions recorded in record_transition(),
+        pages never seen after `last` are sorted by their distance to `last` on the link graph,
+        ties are kept in definition order.
+
+        Args:
+            last (Page): Last known page, or None.
+
+        Yields:
+            Page:
+        """
+        pages = [page for page in cls.iter_pages() if page.check_button is not None]
+        if last is None:
+            yield from pages
+            return
+
+        distance = cls.distance_from(last)
+        unreachable = len(pages) + 1
+        pages = sorted(
+            pages,
+            key=lambda p: (-cls.transitions[(last, p)], distance.get(p, unreachable))
+        )
+        yield from pages
+
+    @classmethod
+    def record_transition(cls, last, page):
+        """
+        Args:
+            last (Page): Last known page, or None.
+            page (Page): Detected page.
+        """
+        if last is None:
+            return
+        cls.transitions[(last, page)] += 1
+
+    @classmethod
+    def conflict_pages(cls, page, offset=(30, 30)):
+        """
+        Pages defined before `page` whose check button search region overlaps the one of `page`.
+        If `page` is detected out of definition order, these pages should be checked again,
+        since a linear scan in definition order would have returned them first.
+        Check buttons of different pages in separate places are not expected on the same screen,
+        if one matches where it shouldn't, fix that asset instead of checking more pages here.
+
+        Args:
+            page (Page):
+            offset (tuple): Detection offset of check buttons.
+
+        Returns:
+            list[Page]: In definition order.
+        """
+        key = (server.server, tuple(offset))
+        if key not in cls._conflicts:
+            pages = [p for p in cls.iter_pages() if p.check_button is not None]
+            regions = {p: p.search_regions(offset) for p in pages}
+            conflicts = {}
+            for index, p in enumerate(pages):
+                conflicts[p] = [
+                    prev for prev in pages[:index]
+                    if any(area_cross_area(a, b, threshold=0) for a in regions[prev] for b in regions[p])
+                ]
+            cls._conflicts[key] = conflicts
+
+        return cls._conflicts[key].get(page, [])
+
     def __init__(self, check_button):
         self.check_button = check_button
         self.links = {}
@@ -73,6 +180,21 @@ class Page:
     def link(self, button, destination):
         self.links[destination] = button
 
+    def search_regions(self, offset=(30, 30)):
+        """
+        Args:
+            offset (tuple): Detection offset of check buttons.
+
+        Returns:
+            list[tuple]: Areas that check buttons of this page are searched in.
+        """
+        buttons = [self.check_button]
+        # page_main is also detected by MAIN_GOTO_CAMPAIGN_WHITE, see UI.ui_page_appear()
+        if self.name == 'page_main':
+            buttons.append(MAIN_GOTO_CAMPAIGN_WHITE)
+        x, y = offset
+        return [(b.area[0] - x, b.area[1] - y, b.area[2] + x, b.area[3] + y) for b in buttons]
+
 
 """
 Define UI pages
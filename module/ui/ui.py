@@ -41,6 +41,37 @@ class UI(InfoHandler):
             return False
         return self.appear(page.check_button, offset=offset, interval=interval)
 
+    def ui_page_detect(self, offset=(30, 30)):
+        """
+        Detect current page on the current screenshot.
+
+        Pages are checked from the most likely ones, based on the last known page.
+        Once a page is detected, pages defined before it with overlapping check regions are verified,
+        so ambiguous screens resolve to the same page as a scan in definition order.
+
+        Args:
+            offset:
+
+        Returns:
+            Page: Detected page, or None if unknown.
+        """
+        last = getattr(self, 'ui_current', None)
+        checked = set()
+        for page in Page.iter_pages_by_likelihood(last):
+            if not self.ui_page_appear(page=page, offset=offset):
+                checked.add(page)
+                continue
+            for prev in Page.conflict_pages(page, offset=offset):
+                if prev in checked:
+                    continue
+                if self.ui_page_appear(page=prev, offset=offset):
+                    page = prev
+                    break
+            Page.record_transition(last, page)
+            return page
+
+        return None
+
     def is_in_main(self, offset=(30, 30), interval=0):
         return self.ui_page_appear(page_main, offset=offset, interval=interval)
 
@@ -182,13 +213,11 @@ class UI(InfoHandler):
                 break
 
             # Known pages
-            for page in Page.iter_pages():
-                if page.check_button is None:
-                    continue
-                if self.ui_page_appear(page=page):
-                    logger.attr("UI", page.name)
-                    self.ui_current = page
-                    return page
+            page = self.ui_page_detect()
+            if page is not None:
+                logger.attr("UI", page.name)
+                self.ui_current = page
+                return page
 
             # Unknown page but able to handle
             logger.info("Unknown ui page")
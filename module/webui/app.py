@@ -45,6 +45,7 @@ from module.config.config import AzurLaneConfig, Function
 from module.config.deep import deep_get, deep_iter, deep_set
 from module.config.env import IS_ON_PHONE_CLOUD
 from module.config.utils import (
+    DEFAULT_TIME,
     alas_instance,
     alas_template,
     dict_to_kv,
@@ -145,6 +146,8 @@ class AlasGUI(Frame):
         # rendered state cache
         self.rendered_cache = []
         self.inst_cache = []
+        # Config and instance state when overview tasks were rendered
+        self.overview_cache = None
         self.load_home = False
         self.af_flag = False
 
@@ -534,7 +537,9 @@ class AlasGUI(Frame):
         self.task_handler.add(switch_log_scroll.g(), 1, True)
         if 'Maa' not in self.ALAS_ARGS:
             self.task_handler.add(switch_dashboard.g(), 1, True)
-        self.task_handler.add(self.alas_update_overview_task, 10, True)
+        # Overview is rendered again only if config changed, checking is cheap
+        self.overview_cache = None
+        self.task_handler.add(self.alas_update_overview_task, 1, True)
         if 'Maa' not in self.ALAS_ARGS:
             self.task_handler.add(self.alas_update_dashboard, 10, True)
         self.task_handler.add(log.put_log(self.alas), 0.25, True)
@@ -582,12 +587,14 @@ class AlasGUI(Frame):
             skip_time_record = False
             valid = []
             invalid = []
-            config = config_updater.read_file(config_name)
+            # Config is kept in memory, read again only if it's modified by Alas
+            config = config_updater.read_resident(config_name)
             n = datetime.now()
             for p, v in deep_iter(config, depth=3):
                 if p[-1].endswith('un') and not isinstance(v, bool):
                     if (v - n).days >= 31:
-                        deep_set(config, p, '')
+                        # Same as '' after config_update(), written data is kept in memory and won't be read again
+                        deep_set(config, p, DEFAULT_TIME)
             for k, v in modified.copy().items():
                 valuetype = deep_get(self.ALAS_ARGS, k + ".valuetype")
                 v = parse_pin_value(v, valuetype)
@@ -631,6 +638,12 @@ class AlasGUI(Frame):
     def alas_update_overview_task(self) -> None:
         if not self.visible:
             return
+        # Skip if config file not modified, and no waiting task reaches its run time
+        cache = (self.alas_name, self.alas_config.get_token(), self.alas.alive)
+        waiting = self.alas_config.waiting_task
+        if cache == self.overview_cache and not (waiting and waiting[0].next_run <= datetime.now()):
+            return
+        self.overview_cache = cache
         self.alas_config.load()
         self.alas_config.get_next_task()
 
@@ -1593,7 +1606,7 @@ def startup():
     if State.deploy_config.DiscordRichPresence:
         init_discord_rpc()
     if State.deploy_config.StartOcrServer:
-        start_ocr_server_process(State.deploy_config.OcrServerPort)
+        start_ocr_server_process(State.deploy_config.OcrServerPort, State.deploy_config.OcrServerWorkers)
     if (
             State.deploy_config.EnableRemoteAccess
             and State.deploy_config.Password is not None
@@ -1,12 +1,19 @@
 import argparse
 import os
-import queue
 import threading
-from multiprocessing import Process
+from collections import deque
+from itertools import islice
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
 from typing import Dict, List, Union
 
 import inflection
+from rich._log_render import LogRender
+from rich.ansi import AnsiDecoder
 from rich.console import Console, ConsoleRenderable
+from rich.containers import Renderables
+from rich.table import Table
+from rich.text import Text
 
 # Since this file does not run under the same process or subprocess of app.py
 # the following code needs to be repeated
@@ -15,22 +22,166 @@ from module.webui.fake_pil_module import *
 
 import_fake_pil_module()
 
-from module.logger import logger, set_file_logger, set_func_logger
+from module.logger import HTMLConsole, Highlighter, WEB_THEME, logger, set_file_logger, set_func_logger
 from module.submodule.submodule import load_mod
 from module.submodule.utils import get_available_func, get_available_mod, get_available_mod_func, get_config_mod, \
     get_func_mod, list_mod_instance
 from module.webui.setting import State
 
 
+class LogRing:
+    def __init__(self, maxlen: int = 400) -> None:
+        """
+        Logs rendered to HTML, shared by all web sessions of an instance.
+
+        Each log is rendered once in the log queue handler thread, instead of once in each session,
+        and kept with an increasing sequence number. Sessions remember the last sequence they showed
+        and take HTML of newer logs only, a reconnected session takes the rendered HTML directly.
+        Logs are rendered in the theme and width that sessions requested last,
+        other themes and widths are rendered on request and cached.
+        """
+        self.maxlen = maxlen
+        # [renderable, {(TerminalTheme, width): html}]
+        self.items = deque(maxlen=maxlen)
+        # Sequence of the last log, the first log is 1
+        self.seq = 0
+        # (TerminalTheme, width) that sessions requested last, None to use the current theme
+        self.last_key = None
+        self.lock = threading.Lock()
+        self.console = HTMLConsole(
+            force_terminal=False,
+            force_interactive=False,
+            width=80,
+            color_system="truecolor",
+            markup=False,
+            record=True,
+            safe_box=False,
+            highlighter=Highlighter(),
+            theme=WEB_THEME,
+        )
+
+    @staticmethod
+    def current_theme():
+        from module.webui.utils import DARK_TERMINAL_THEME, LIGHT_TERMINAL_THEME
+        return DARK_TERMINAL_THEME if State.theme == "dark" else LIGHT_TERMINAL_THEME
+
+    def _render(self, item, theme, width) -> str:
+        html = item[1].get((theme, width))
+        if html is None:
+            from module.webui.utils import LOG_CODE_FORMAT
+            self.console.width = width
+            with self.console.capture():
+                self.console.print(item[0])
+            html = self.console.export_html(
+                theme=theme,
+                clear=True,
+                code_format=LOG_CODE_FORMAT,
+                inline_styles=True,
+            )
+            item[1][(theme, width)] = html
+        return html
+
+    def append(self, renderable) -> None:
+        with self.lock:
+            item = [renderable, {}]
+            theme, width = self.last_key or (self.current_theme(), 80)
+            self._render(item, theme, width)
+            self.items.append(item)
+            self.seq += 1
+
+    def since(self, seq, theme, width=80):
+        """
+        Args:
+            seq (int, None): Last sequence that session showed, None to get all.
+            theme (TerminalTheme):
+            width (int): Width of the log area of session, in characters.
+
+        Returns:
+            tuple[bool, int, int, str]: (reset, seq, count, html)
+                reset: True if session should clear shown logs,
+                    logs after `seq` were dropped, or `seq` is None.
+                seq: Sequence of the last log.
+                count: Number of logs in html.
+                html: Rendered logs.
+        """
+        with self.lock:
+            self.last_key = (theme, width)
+            first = self.seq - len(self.items) + 1
+            if seq is None or seq < first - 1 or seq > self.seq:
+                reset, items = True, list(self.items)
+            else:
+                reset, items = False, list(islice(self.items, seq - first + 1, None))
+            html = "".join([self._render(item, theme, width) for item in items])
+            return reset, self.seq, len(items), html
+
+
+class LogSender:
+    # Same layout as the RichRenderableHandler in set_func_logger()
+    log_render = LogRender(show_time=False, show_level=True, show_path=False, level_width=None)
+
+    def __init__(self, conn: Connection) -> None:
+        """
+        Send logs from alas process to webui through a pipe.
+
+        Log lines are sent as ANSI text of their level and message, which is compact and cheap to pickle.
+        Text is not wrapped here, webui decodes it back into rich Text and lays out log lines again,
+        so they are wrapped at the width of each web session and theme colors still apply.
+        Other renderables, such as rules and tracebacks, depend on width, they are sent as they are.
+        """
+        self.conn = conn
+        self.console = HTMLConsole(
+            force_terminal=False,
+            force_interactive=False,
+            width=80,
+            color_system="truecolor",
+            markup=False,
+            safe_box=False,
+            highlighter=Highlighter(),
+            theme=WEB_THEME,
+        )
+
+    def encode(self, renderable) -> Union[str, None]:
+        """
+        Returns:
+            str: ANSI text without wrapping, or None if renderable is not text.
+        """
+        if isinstance(renderable, Renderables):
+            renderables = list(renderable)
+            if len(renderables) != 1:
+                return None
+            renderable = renderables[0]
+        if not isinstance(renderable, Text):
+            return None
+        with self.console.capture() as capture:
+            self.console.print(renderable, soft_wrap=True, end="")
+        return capture.get()
+
+    def send(self, renderable: ConsoleRenderable) -> None:
+        payload = renderable
+        # Log lines are tables of level and message, see LogRender
+        if isinstance(renderable, Table) and len(renderable.columns) == 2 and renderable.row_count == 1:
+            cells = [self.encode(cell) for column in renderable.columns for cell in column.cells]
+            if None not in cells:
+                payload = tuple(cells)
+        self.conn.send(payload)
+
+    @classmethod
+    def decode(cls, payload) -> ConsoleRenderable:
+        if isinstance(payload, tuple):
+            level, message = [Text("\n").join(AnsiDecoder().decode(cell)) for cell in payload]
+            return cls.log_render(None, [message], level=level)
+        return payload
+
+
 class ProcessManager:
     _processes: Dict[str, "ProcessManager"] = {}
 
     def __init__(self, config_name: str = "alas") -> None:
         self.config_name = config_name
-        self._renderable_queue: queue.Queue[ConsoleRenderable] = State.manager.Queue()
         self.renderables: List[ConsoleRenderable] = []
         self.renderables_max_length = 400
         self.renderables_reduce_length = 80
+        self.logs = LogRing(maxlen=self.renderables_max_length)
         self._process: Process = None
         self._process_locks: Dict[str, threading.Lock] = {}
         self.thd_log_queue_handler: threading.Thread = None
@@ -39,26 +190,25 @@ class ProcessManager:
         if not self.alive:
             if func is None:
                 func = get_config_mod(self.config_name)
+            # A new pipe for each process, logs of the previous process may still be in reading
+            reader, writer = Pipe(duplex=False)
             self._process = Process(
                 target=ProcessManager.run_process,
                 args=(
                     self.config_name,
                     func,
-                    self._renderable_queue,
+                    writer,
                     ev,
                 ),
             )
             self._process.start()
-            self.start_log_queue_handler()
-
-    def start_log_queue_handler(self):
-        if (
-            self.thd_log_queue_handler is not None
-            and self.thd_log_queue_handler.is_alive()
-        ):
-            return
+            # Close the write end in webui, so reader gets EOF when alas process exits
+            writer.close()
+            self.start_log_queue_handler(reader)
+
+    def start_log_queue_handler(self, reader: Connection):
         self.thd_log_queue_handler = threading.Thread(
-            target=self._thread_log_queue_handler
+            target=self._thread_log_queue_handler, args=(reader,)
         )
         self.thd_log_queue_handler.start()
 
@@ -72,9 +222,7 @@ class ProcessManager:
         with lock:
             if self.alive:
                 self._process.kill()
-                self.renderables.append(
-                    f"[{self.config_name}] exited. Reason: Manual stop\n"
-                )
+                self.append_log(f"[{self.config_name}] exited. Reason: Manual stop\n")
             if self.thd_log_queue_handler is not None:
                 self.thd_log_queue_handler.join(timeout=1)
                 if self.thd_log_queue_handler.is_alive():
@@ -83,17 +231,25 @@ class ProcessManager:
                     )
         logger.info(f"[{self.config_name}] exited")
 
-    def _thread_log_queue_handler(self) -> None:
-        while self.alive:
-            try:
-                log = self._renderable_queue.get(timeout=1)
-            except queue.Empty:
-                continue
-            self.renderables.append(log)
-            if len(self.renderables) > self.renderables_max_length:
-                self.renderables = self.renderables[self.renderables_reduce_length :]
+    def _thread_log_queue_handler(self, reader: Connection) -> None:
+        try:
+            # Read the remaining logs after alas process exits
+            while self.alive or reader.poll():
+                if not reader.poll(1):
+                    continue
+                self.append_log(LogSender.decode(reader.recv()))
+        except (EOFError, OSError):
+            pass
+        finally:
+            reader.close()
         logger.info("End of log queue handler loop")
 
+    def append_log(self, log) -> None:
+        self.renderables.append(log)
+        if len(self.renderables) > self.renderables_max_length:
+            self.renderables = self.renderables[self.renderables_reduce_length :]
+        self.logs.append(log)
+
     @property
     def alive(self) -> bool:
         if self._process is not None:
@@ -132,7 +288,7 @@ class ProcessManager:
 
     @staticmethod
     def run_process(
-        config_name, func: str, q: queue.Queue, e: threading.Event = None
+        config_name, func: str, conn: Connection, e: threading.Event = None
     ) -> None:
         parser = argparse.ArgumentParser()
         parser.add_argument(
@@ -148,7 +304,9 @@ class ProcessManager:
             logger.info("Electron detected, remove log output to stdout")
             from module.logger import console_hdlr
             logger.removeHandler(console_hdlr)
-        set_func_logger(func=q.put)
+        set_func_logger(func=LogSender(conn).send)
+        # Render logs in background, task thread only puts records into queue
+        logger.set_async_logger()
 
         from module.config.config import AzurLaneConfig
 
@@ -181,6 +339,8 @@ class ProcessManager:
             logger.info(f"[{config_name}] exited. Reason: Finish\n")
         except Exception as e:
             logger.exception(e)
+        finally:
+            logger.flush()
 
     @classmethod
     def running_instances(cls) -> List["ProcessManager"]:
@@ -9,7 +9,6 @@ from pywebio.exceptions import SessionException
 from pywebio.io_ctrl import Output
 from pywebio.output import *
 from pywebio.session import eval_js, local, run_js
-from rich.console import ConsoleRenderable
 
 from module.logger import HTMLConsole, Highlighter, WEB_THEME
 from module.webui.lang import t
@@ -19,7 +18,6 @@ from module.webui.setting import State
 from module.webui.utils import (
     DARK_TERMINAL_THEME,
     LIGHT_TERMINAL_THEME,
-    LOG_CODE_FORMAT,
     Switch,
 )
 
@@ -105,19 +103,6 @@ class RichLog:
         else:
             self.terminal_theme = LIGHT_TERMINAL_THEME
 
-    def render(self, renderable: ConsoleRenderable) -> str:
-        with self.console.capture():
-            self.console.print(renderable)
-
-        html = self.console.export_html(
-            theme=self.terminal_theme,
-            clear=True,
-            code_format=LOG_CODE_FORMAT,
-            inline_styles=True,
-        )
-        # print(html)
-        return html
-
     def extend(self, text):
         if text:
             run_js(
@@ -201,22 +186,20 @@ class RichLog:
     def put_log(self, pm: ProcessManager) -> Generator:
         yield
         try:
+            seq = None
+            counter = 0
             while True:
-                last_idx = len(pm.renderables)
-                html = "".join(map(self.render, pm.renderables[:]))
-                self.reset()
+                # Logs are rendered once in ProcessManager for each theme and width, take HTML of new logs only
+                reset, seq, count, html = pm.logs.since(seq, theme=self.terminal_theme, width=self.console.width)
+                if reset:
+                    self.reset()
+                    counter = 0
                 self.extend(html)
-                counter = last_idx
-                while counter < pm.renderables_max_length * 2:
-                    yield
-                    idx = len(pm.renderables)
-                    if idx < last_idx:
-                        last_idx -= pm.renderables_reduce_length
-                    if idx != last_idx:
-                        html = "".join(map(self.render, pm.renderables[last_idx:idx]))
-                        self.extend(html)
-                        counter += idx - last_idx
-                        last_idx = idx
+                counter += count
+                yield
+                # Clear shown logs sometimes, re-take all logs in ring
+                if counter >= pm.renderables_max_length * 2:
+                    seq = None
         except SessionException:
             pass
 
@@ -69,6 +69,7 @@ class ConfigGenerator(config_updater.ConfigGenerator):
 
 
 class ConfigUpdater(config_updater.ConfigUpdater):
+    mod_name = 'maa'
     redirection = []
 
     @cached_property
@@ -79,10 +80,6 @@ class ConfigUpdater(config_updater.ConfigUpdater):
         old = read_file(filepath_config(config_name, 'maa'))
         return self.config_update(old, is_template=is_template)
 
-    @staticmethod
-    def write_file(config_name, data, mod_name='maa'):
-        write_file(filepath_config(config_name, mod_name), data)
-
     def config_update(self, old, is_template=False):
         """
         Args: